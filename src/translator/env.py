@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import os
+
+
+def read_env_int(name: str, default: int) -> int:
+    # Unset, blank, non-numeric and negative values all fall back to default.
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    raw = raw.strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    if value < 0:
+        return default
+    return value
@@ -1,15 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import html
-import importlib
+import json
 import logging
 import os
+import random
 import re
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Protocol, Sequence, TypeVar, cast
+import functools
+import importlib.util
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, cast
 
 import requests
 
+try:
+    import orjson  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
+try:
+    import httpx  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover - async fetches use a thread
+    httpx = None
+
+from .env import read_env_int
 from .markdown_autofix import normalize_list_fence_indentation
 
 
@@ -21,22 +40,26 @@ DEFAULT_BACKOFF_INITIAL = 1
 DEFAULT_BACKOFF_MAX = 20
 
 logger = logging.getLogger(__name__)
+# httpx only negotiates HTTP/2 when the optional h2 package is installed.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# One keep-alive session for all Reader requests; see _get_session.
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+# Opt-in: fetched markdown is reused per (URL, config) for a short window
+# instead of hitting the Reader again; 0 disables the cache.
+_FETCH_CACHE_SIZE = read_env_int("TRANSLATOR_FETCH_CACHE_SIZE", 0)
+_FETCH_CACHE_TTL_SECONDS = read_env_int("TRANSLATOR_FETCH_CACHE_TTL_SECONDS", 600)
+_FETCH_CACHE: "OrderedDict[Tuple[str, JinaReaderConfig], Tuple[float, str]]" = (
+    OrderedDict()
+)
+_FETCH_CACHE_LOCK = threading.Lock()
 
 
-def _log_jina_retry(retry_state) -> None:
+def _log_jina_retry(attempt: int, exc: Exception, sleep_sec: float) -> None:
     if os.environ.get("TRANSLATOR_RETRY_LOG", "1") == "0":
         return
-    attempt = retry_state.attempt_number
-    outcome = retry_state.outcome
-    if outcome is None:
-        return
-    exc = outcome.exception()
-    if exc is None:
-        return
-    exc_class = type(exc).__name__
-    sleep_sec = 0.0
-    if retry_state.next_action is not None:
-        sleep_sec = retry_state.next_action.sleep
     status = None
     if isinstance(exc, requests.RequestException):
         response = getattr(exc, "response", None)
@@ -45,7 +68,7 @@ def _log_jina_retry(retry_state) -> None:
     logger.warning(
         "Jina Reader retry attempt=%d exception=%s status=%s sleep=%.2fs",
         attempt,
-        exc_class,
+        type(exc).__name__,
         status,
         sleep_sec,
     )
@@ -59,25 +82,10 @@ class JinaReaderTransientError(JinaReaderError):
     pass
 
 
-T = TypeVar("T")
-
-
-class TenacityModule(Protocol):
-    def retry(
-        self,
-        *,
-        retry: object,
-        wait: object,
-        stop: object,
-        reraise: bool,
-        before_sleep: Optional[object] = None,
-    ) -> Callable[[Callable[..., T]], Callable[..., T]]: ...
-
-    def retry_if_exception_type(self, exception_types: object) -> object: ...
-
-    def wait_exponential_jitter(self, *, initial: float, max: float) -> object: ...
-
-    def stop_after_attempt(self, max_attempt_number: int) -> object: ...
+# Both decoders take the raw body bytes and raise ValueError subclasses.
+_json_loads: Callable[[bytes], object] = (
+    orjson.loads if orjson is not None else json.loads
+)
 
 
 @dataclass(frozen=True)
@@ -96,26 +104,43 @@ class SnapdownBlock:
     heading: Optional[str] = None
 
 
-def _build_headers() -> Dict[str, str]:
+def _get_session() -> requests.Session:
+    # Reusing pooled connections skips a TCP and TLS handshake per fetch.
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+        return _SESSION
+
+
+def _build_headers() -> Mapping[str, str]:
+    # Only the key lookup runs per call; a changed JINA_API_KEY still applies.
+    # Accept-Encoding is left to each transport, which advertises exactly the
+    # encodings it can decode.
+    return _build_headers_cached(os.getenv("JINA_API_KEY"))
+
+
+@functools.lru_cache(maxsize=1)
+def _build_headers_cached(api_key: Optional[str]) -> Mapping[str, str]:
     headers = {
         "Accept": "application/json",
         "X-Return-Format": "markdown",
     }
-    api_key = os.getenv("JINA_API_KEY")
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
-    return headers
+    return MappingProxyType(headers)
 
 
 def _extract_content(payload: Dict[str, object]) -> Optional[str]:
+    # Payloads come straight from the JSON decoder, so exact type checks
+    # suffice; no str or dict subclasses can appear.
     content = payload.get("content")
-    if isinstance(content, str):
+    if type(content) is str:
         return content
     data = payload.get("data")
-    if isinstance(data, dict):
-        data_map = cast(Dict[str, object], data)
-        content = data_map.get("content")
-        if isinstance(content, str):
+    if type(data) is dict:
+        content = data.get("content")
+        if type(content) is str:
             return content
     return None
 
@@ -201,20 +226,16 @@ def _render_snapdown_section(blocks: Sequence[SnapdownBlock]) -> str:
 
 
 def _response_error_message(
-    response: requests.Response, payload: Optional[Dict[str, object]]
+    status_code: int, payload: Optional[Dict[str, object]]
 ) -> str:
     if payload is None:
-        return f"Unexpected HTTP {response.status_code} with non-JSON body"
+        return f"Unexpected HTTP {status_code} with non-JSON body"
     code = payload.get("code")
     status = payload.get("status")
     message = payload.get("message")
     return f"Unexpected response code={code} status={status} message={message}"
 
 
-def _is_transient_status(status_code: int) -> bool:
-    return status_code == 429 or status_code >= 500
-
-
 def fetch_snapdown_blocks(
     url: str, config: Optional[JinaReaderConfig] = None
 ) -> List[SnapdownBlock]:
@@ -286,80 +307,199 @@ def fetch_markdown(url: str, config: Optional[JinaReaderConfig] = None) -> str:
         raise JinaReaderError("URL must be a non-empty string")
 
     config = config or JinaReaderConfig()
-    headers = _build_headers()
     clean_url = url.strip()
+    cache_key = (clean_url, config)
+    cached = _cached_markdown(cache_key)
+    if cached is not None:
+        return cached
+    markdown = _fetch_markdown_uncached(clean_url, config)
+    _store_markdown(cache_key, markdown)
+    return markdown
+
+
+async def fetch_markdown_async(
+    url: str,
+    config: Optional[JinaReaderConfig] = None,
+    *,
+    client: Optional["httpx.AsyncClient"] = None,
+) -> str:
+    # With httpx, fetches sharing one ``client`` multiplex over a single
+    # connection (HTTP/2 when h2 is installed); without it the blocking fetch
+    # runs in the loop's default executor.
+    if not url.strip():
+        raise JinaReaderError("URL must be a non-empty string")
+
+    config = config or JinaReaderConfig()
+    clean_url = url.strip()
+    cache_key = (clean_url, config)
+    cached = _cached_markdown(cache_key)
+    if cached is not None:
+        return cached
+    if httpx is None:
+        loop = asyncio.get_running_loop()
+        markdown = await loop.run_in_executor(
+            None, _fetch_markdown_uncached, clean_url, config
+        )
+    elif client is not None:
+        markdown = await _afetch_markdown_uncached(client, clean_url, config)
+    else:
+        async with httpx.AsyncClient(http2=_HTTP2_AVAILABLE) as owned_client:
+            markdown = await _afetch_markdown_uncached(
+                owned_client, clean_url, config
+            )
+    _store_markdown(cache_key, markdown)
+    return markdown
+
+
+def fetch_markdown_bytes(
+    url: str, config: Optional[JinaReaderConfig] = None
+) -> bytes:
+    return fetch_markdown(url, config=config).encode("utf-8")
+
+
+def clear_fetch_cache() -> None:
+    # Drops every cached fetch, e.g. after an upstream page was edited.
+    with _FETCH_CACHE_LOCK:
+        _FETCH_CACHE.clear()
+
+
+def _cached_markdown(cache_key: Tuple[str, JinaReaderConfig]) -> Optional[str]:
+    if _FETCH_CACHE_SIZE <= 0:
+        return None
+    with _FETCH_CACHE_LOCK:
+        entry = _FETCH_CACHE.get(cache_key)
+        if entry is None:
+            return None
+        fetched_at, markdown = entry
+        if time.monotonic() - fetched_at > _FETCH_CACHE_TTL_SECONDS:
+            del _FETCH_CACHE[cache_key]
+            return None
+        _FETCH_CACHE.move_to_end(cache_key)
+    return markdown
+
+
+def _store_markdown(cache_key: Tuple[str, JinaReaderConfig], markdown: str) -> None:
+    if _FETCH_CACHE_SIZE <= 0:
+        return
+    with _FETCH_CACHE_LOCK:
+        _FETCH_CACHE[cache_key] = (time.monotonic(), markdown)
+        _FETCH_CACHE.move_to_end(cache_key)
+        while len(_FETCH_CACHE) > _FETCH_CACHE_SIZE:
+            _ = _FETCH_CACHE.popitem(last=False)
+
+
+def _fetch_markdown_uncached(clean_url: str, config: JinaReaderConfig) -> str:
+    headers = _build_headers()
+    session = _get_session()
+    # Fragments would be dropped from a GET path, so those URLs are POSTed.
+    has_fragment = "#" in clean_url
+    get_url = f"{JINA_READER_BASE_URL}{clean_url}"
 
     def do_request() -> str:
-        if "#" in clean_url:
-            response = requests.post(
+        if has_fragment:
+            response = session.post(
                 JINA_READER_BASE_URL,
                 data={"url": clean_url},
                 headers=headers,
                 timeout=config.timeout_seconds,
             )
         else:
-            response = requests.get(
-                f"{JINA_READER_BASE_URL}{clean_url}",
+            response = session.get(
+                get_url,
                 headers=headers,
                 timeout=config.timeout_seconds,
             )
+        return _parse_reader_response(response.status_code, response.content, config)
 
-        if _is_transient_status(response.status_code):
-            raise JinaReaderTransientError(
-                f"Transient HTTP {response.status_code} from Jina Reader"
-            )
-
-        payload: Optional[Dict[str, object]]
+    attempt = 1
+    while True:
         try:
-            payload_obj = cast(object, response.json())
-        except ValueError:
-            payload_obj = None
-
-        if isinstance(payload_obj, dict):
-            payload = cast(Dict[str, object], payload_obj)
-        else:
-            payload = None
+            return do_request()
+        except (JinaReaderTransientError, requests.RequestException) as exc:
+            if attempt >= config.max_attempts:
+                raise
+            sleep_sec = _retry_delay(attempt, config)
+            _log_jina_retry(attempt, exc, sleep_sec)
+            time.sleep(sleep_sec)
+            attempt += 1
+
+
+def _parse_reader_response(
+    status_code: int, body: bytes, config: JinaReaderConfig
+) -> str:
+    # Rate limiting and any server error are worth retrying.
+    if status_code == 429 or status_code >= 500:
+        raise JinaReaderTransientError(f"Transient HTTP {status_code} from Jina Reader")
 
-        if response.status_code != 200:
-            raise JinaReaderError(_response_error_message(response, payload))
+    payload: Optional[Dict[str, object]]
+    try:
+        payload_obj = _json_loads(body)
+    except ValueError:
+        payload_obj = None
 
-        if payload is None:
-            raise JinaReaderError("Expected JSON response from Jina Reader")
+    if isinstance(payload_obj, dict):
+        payload = cast(Dict[str, object], payload_obj)
+    else:
+        payload = None
 
-        if payload.get("code") != 200:
-            raise JinaReaderError(_response_error_message(response, payload))
+    if status_code != 200:
+        raise JinaReaderError(_response_error_message(status_code, payload))
 
-        content = _extract_content(payload)
-        if not content:
-            raise JinaReaderError("Missing content in Jina Reader response")
+    if payload is None:
+        raise JinaReaderError("Expected JSON response from Jina Reader")
 
-        if len(content) < config.min_content_length:
-            raise JinaReaderError(
-                f"Content too short ({len(content)} < {config.min_content_length})"
-            )
+    if payload.get("code") != 200:
+        raise JinaReaderError(_response_error_message(status_code, payload))
 
-        return _fix_jina_list_codeblocks(content)
+    content = _extract_content(payload)
+    if not content:
+        raise JinaReaderError("Missing content in Jina Reader response")
 
-    try:
-        tenacity = cast(
-            TenacityModule,
-            cast(object, importlib.import_module("tenacity")),
-        )
-    except ModuleNotFoundError as exc:
+    if len(content) < config.min_content_length:
         raise JinaReaderError(
-            "tenacity is required for retry logic; install it before running"
-        ) from exc
-
-    retrying = tenacity.retry(
-        retry=tenacity.retry_if_exception_type(
-            (JinaReaderTransientError, requests.RequestException)
-        ),
-        wait=tenacity.wait_exponential_jitter(
-            initial=config.backoff_initial, max=config.backoff_max
-        ),
-        stop=tenacity.stop_after_attempt(config.max_attempts),
-        before_sleep=_log_jina_retry,
-        reraise=True,
-    )
+            f"Content too short ({len(content)} < {config.min_content_length})"
+        )
+
+    return _fix_jina_list_codeblocks(content)
+
+
+async def _afetch_markdown_uncached(
+    client: "httpx.AsyncClient", clean_url: str, config: JinaReaderConfig
+) -> str:
+    headers = dict(_build_headers())
+    has_fragment = "#" in clean_url
+    get_url = f"{JINA_READER_BASE_URL}{clean_url}"
+
+    async def do_request() -> str:
+        if has_fragment:
+            response = await client.post(
+                JINA_READER_BASE_URL,
+                data={"url": clean_url},
+                headers=headers,
+                timeout=config.timeout_seconds,
+            )
+        else:
+            response = await client.get(
+                get_url,
+                headers=headers,
+                timeout=config.timeout_seconds,
+            )
+        return _parse_reader_response(response.status_code, response.content, config)
 
-    return retrying(do_request)()
+    attempt = 1
+    while True:
+        try:
+            return await do_request()
+        except (JinaReaderTransientError, httpx.TransportError) as exc:
+            if attempt >= config.max_attempts:
+                raise
+            sleep_sec = _retry_delay(attempt, config)
+            _log_jina_retry(attempt, exc, sleep_sec)
+            await asyncio.sleep(sleep_sec)
+            attempt += 1
+
+
+def _retry_delay(attempt: int, config: JinaReaderConfig) -> float:
+    # Exponential backoff with up to one second of jitter, capped at the max.
+    delay = config.backoff_initial * 2 ** (attempt - 1) + random.uniform(0, 1)
+    return max(0.0, min(delay, config.backoff_max))
@@ -3,14 +3,17 @@ from __future__ import annotations
 # pyright: reportMissingImports=false
 # pyright: reportUnknownVariableType=false
 
+import asyncio
 import logging
 import os
 import re
+import weakref
 from typing import Dict, List, Optional, cast
 
-from openai import APIError, OpenAI, RateLimitError
+from openai import APIError, AsyncOpenAI, OpenAI, RateLimitError
 from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 from tenacity import (  # type: ignore[import-not-found]
+    AsyncRetrying,
     Retrying,
     retry_if_exception,
     stop_after_attempt,
@@ -79,7 +82,13 @@ class KimiClient:
             or (env_base_url.strip() if env_base_url else None)
             or _DEFAULT_BASE_URL
         )
+        self._api_key: str = api_key
+        self._base_url: str = resolved_base_url
         self._client: OpenAI = OpenAI(api_key=api_key, base_url=resolved_base_url)
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_client_loop: Optional[
+            "weakref.ReferenceType[asyncio.AbstractEventLoop]"
+        ] = None
         env_model = os.environ.get(_MODEL_ENV)
         resolved_model = (
             model or (env_model.strip() if env_model else None) or _DEFAULT_MODEL
@@ -89,6 +98,10 @@ class KimiClient:
         self._max_retries: int = max_retries
         self._max_backoff: float = max_backoff
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     def chat_completion(
         self,
         messages: List[ChatCompletionMessageParam],
@@ -99,6 +112,33 @@ class KimiClient:
     ) -> str:
         request_timeout = self._timeout if timeout is None else timeout
         response = self._request_with_retry(messages, json_mode, request_timeout)
+        return self._response_content(
+            response, json_mode, preservation_map, expected_placeholders
+        )
+
+    async def achat_completion(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        preservation_map: Optional[Dict[str, object]] = None,
+        expected_placeholders: Optional[List[str]] = None,
+    ) -> str:
+        request_timeout = self._timeout if timeout is None else timeout
+        response = await self._arequest_with_retry(
+            messages, json_mode, request_timeout
+        )
+        return self._response_content(
+            response, json_mode, preservation_map, expected_placeholders
+        )
+
+    def _response_content(
+        self,
+        response: ChatCompletion,
+        json_mode: bool,
+        preservation_map: Optional[Dict[str, object]],
+        expected_placeholders: Optional[List[str]],
+    ) -> str:
         if not response.choices:
             raise RuntimeError("chat completion returned no choices")
 
@@ -153,6 +193,50 @@ class KimiClient:
                 )
         raise RuntimeError("retrying chat completion exhausted unexpectedly")
 
+    async def _arequest_with_retry(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        json_mode: bool,
+        timeout: float,
+    ) -> ChatCompletion:
+        client = self._get_async_client()
+        retrying = AsyncRetrying(
+            retry=retry_if_exception(self._is_retryable_error),
+            stop=stop_after_attempt(self._max_retries),
+            wait=wait_random_exponential(multiplier=1, max=self._max_backoff),
+            before_sleep=lambda retry_state: _log_llm_retry(retry_state, self._model),
+            reraise=True,
+        )
+        async for attempt in retrying:
+            with attempt:
+                if json_mode:
+                    return await client.chat.completions.create(
+                        model=self._model,
+                        messages=messages,
+                        timeout=timeout,
+                        response_format={"type": "json_object"},
+                    )
+                return await client.chat.completions.create(
+                    model=self._model,
+                    messages=messages,
+                    timeout=timeout,
+                )
+        raise RuntimeError("retrying chat completion exhausted unexpectedly")
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        # Created lazily so sync-only callers never open an async transport;
+        # one instance keeps its connection pool warm across all chunks. The
+        # pool belongs to the loop that opened it, so a new loop (e.g. a later
+        # asyncio.run) gets a fresh client instead of dead connections.
+        loop = asyncio.get_running_loop()
+        owner = self._async_client_loop
+        if self._async_client is None or owner is None or owner() is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=self._api_key, base_url=self._base_url
+            )
+            self._async_client_loop = weakref.ref(loop)
+        return self._async_client
+
     @staticmethod
     def _strip_code_fences(text: str) -> str:
         match = _CODE_FENCE_RE.match(text)
@@ -274,8 +274,16 @@ def _render_meta(*, source_type: str, source_value: str, model_id: str) -> str:
     return "\n".join(lines)
 
 
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+_HR_HEADING_RE = re.compile(r"^([=]{3,}|[-]{3,})\s*(#{1,6}\s+)", re.MULTILINE)
+_BLOCKQUOTE_HEADING_RE = re.compile(r"^(>[^\n]*?)(#{1,6}\s+)", re.MULTILINE)
+_LIST_HEADING_RE = re.compile(r"^([ \t]*[-*+]\s+[^\n]*?)(#{1,6}\s+)", re.MULTILINE)
+_OL_HEADING_RE = re.compile(r"^([ \t]*\d+[.)]\s+[^\n]*?)(#{1,6}\s+)", re.MULTILINE)
+_SENTENCE_HEADING_RE = re.compile(r"([.!?。！？\]\)])\s*(#{2,6}\s+)")
+
+
 def _render_title(title: str) -> str:
-    compact = re.sub(r"\s+", " ", title).strip()
+    compact = _WHITESPACE_RUN_RE.sub(" ", title).strip()
     compact = compact.lstrip("#").strip()
     if not compact:
         compact = "Document"
@@ -283,35 +291,15 @@ def _render_title(title: str) -> str:
 
 
 def _fix_heading_collisions(text: str) -> str:
-    text = re.sub(
-        r"^([=]{3,}|[-]{3,})\s*(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    text = re.sub(
-        r"^(>[^\n]*?)(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    text = re.sub(
-        r"^([ \t]*[-*+]\s+[^\n]*?)(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    text = re.sub(
-        r"^([ \t]*\d+[.)]\s+[^\n]*?)(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    return re.sub(
-        r"([.!?。！？\]\)])\s*(#{2,6}\s+)",
-        r"\1\n\2",
-        text,
-    )
+    for pattern in (
+        _HR_HEADING_RE,
+        _BLOCKQUOTE_HEADING_RE,
+        _LIST_HEADING_RE,
+        _OL_HEADING_RE,
+        _SENTENCE_HEADING_RE,
+    ):
+        text = pattern.sub(r"\1\n\2", text)
+    return text
 
 
 def _render_outline(outline: Sequence[Dict[str, object]]) -> str:
@@ -410,6 +398,8 @@ def _require_str_list(value: object, label: str) -> List[str]:
 
 
 def _escape_table_cell(value: str) -> str:
+    if "|" not in value and "\n" not in value:
+        return value
     escaped = value.replace("|", "\\|")
     return escaped.replace("\n", "<br>")
 
@@ -12,18 +12,36 @@ class ProtectedSpan:
     kind: str
 
 
+@dataclass(frozen=True)
+class PreservationCounts:
+    fences: int
+    math_delimiters: Tuple[int, int, int, int, int, int, int, int]
+    url_targets: Tuple[str, ...]
+
+
 class PreservationError(RuntimeError):
     pass
 
 
 _PLACEHOLDER_RE = re.compile(r"(?<![_A-Za-z0-9])__([A-Z][A-Z_]*)_[0-9]{3}__")
+# Every position where a placeholder-shaped token starts, glued or not; a
+# kind holds no digits, so the token starting at a position is unique.
+_PLACEHOLDER_CANDIDATE_RE = re.compile(r"(?=(__[A-Z][A-Z_]*_[0-9]{3}__))")
 _FENCE_START_RE = re.compile(r"^[ \t]*(`{3,}|~{3,})")
-_FENCE_LINE_RE = re.compile(r"^[ \t]*(`{3,}|~{3,})", re.MULTILINE)
 _BEGIN_MATH_RE = re.compile(r"\\begin\{([^\}]+)\}")
 _HTML_TAG_RE = re.compile(
     r"(?s)<(?:!--.*?--|!DOCTYPE[^<>]*|/?[A-Za-z][A-Za-z0-9:-]*(?:\s[^<>]*?)?/?)>"
 )
 _REFERENCE_DEF_PREFIX_RE = re.compile(r"^[ \t]*\[[^\]]+\]:[ \t]*")
+# A backslash run with the character after it, or an unescaped "$"/"$$".
+_MATH_MARK_RE = re.compile(r"\\+[()\[\]$]?|\$\$?")
+_BEGIN_ENV_RE = re.compile(r"(?<!\\)\\begin\{[^\}]+\}")
+_END_ENV_RE = re.compile(r"(?<!\\)\\end\{[^\}]+\}")
+_MATH_MARK_SLOTS = {"(": 2, ")": 3, "[": 4, "]": 5}
+_NO_MATH_DELIMITERS = (0, 0, 0, 0, 0, 0, 0, 0)
+_FENCE_MARKERS = ("```", "~~~")
+_MATH_SYMBOL_RE = re.compile(r"[\\^_=\{\}\[\]<>+\-*/]")
+_ASCII_LETTER_RE = re.compile(r"[A-Za-z]")
 
 
 def protect(text: str, *, skip_inline_code: bool = False) -> Tuple[str, Dict[str, str]]:
@@ -32,14 +50,24 @@ def protect(text: str, *, skip_inline_code: bool = False) -> Tuple[str, Dict[str
     restoration_map: Dict[str, str] = {}
     counters: Dict[str, int] = {}
 
+    # Each pass only runs when its marker occurs in the source; placeholders
+    # never introduce markers, so the checks on ``text`` stay valid throughout.
     protected_text = text
-    protected_text = _extract_fenced_code(protected_text, counters, restoration_map)
-    protected_text = _extract_display_math(protected_text, counters, restoration_map)
-    protected_text = _extract_inline_math(protected_text, counters, restoration_map)
-    if not skip_inline_code:
+    if "```" in text or "~~~" in text:
+        protected_text = _extract_fenced_code(protected_text, counters, restoration_map)
+    has_dollar = "$" in text
+    if has_dollar or "\\[" in text or "\\begin{" in text:
+        protected_text = _extract_display_math(
+            protected_text, counters, restoration_map
+        )
+    if has_dollar or "\\(" in text:
+        protected_text = _extract_inline_math(protected_text, counters, restoration_map)
+    if not skip_inline_code and "`" in text:
         protected_text = _extract_inline_code(protected_text, counters, restoration_map)
-    protected_text = _extract_urls(protected_text, counters, restoration_map)
-    protected_text = _extract_html(protected_text, counters, restoration_map)
+    if "[" in text:
+        protected_text = _extract_urls(protected_text, counters, restoration_map)
+    if "<" in text:
+        protected_text = _extract_html(protected_text, counters, restoration_map)
 
     validate_restoration(protected_text, restoration_map)
     return protected_text, restoration_map
@@ -58,21 +86,42 @@ def restore(
     if not restoration_map:
         return protected_text
 
-    present_keys = [k for k in restoration_map if k in protected_text]
-    if not present_keys:
+    # One left-to-right pass; a key also counts when glued to a word or to
+    # another placeholder, which _PLACEHOLDER_RE's lookbehind would skip.
+    parts: List[str] = []
+    cursor = 0
+    for match in _PLACEHOLDER_CANDIDATE_RE.finditer(protected_text):
+        start = match.start()
+        if start < cursor:
+            continue
+        placeholder = match.group(1)
+        value = restoration_map.get(placeholder)
+        if value is None:
+            continue
+        parts.append(protected_text[cursor:start])
+        parts.append(value)
+        cursor = start + len(placeholder)
+    if not parts:
         return protected_text
 
-    pattern = re.compile(
-        "|".join(re.escape(key) for key in sorted(present_keys, key=len, reverse=True))
-    )
-    restored = pattern.sub(
-        lambda match: restoration_map[match.group(0)], protected_text
-    )
+    parts.append(protected_text[cursor:])
+    restored = "".join(parts)
     _ensure_no_placeholders(restored, label="restored text")
     return restored
 
 
 def validate_restoration(protected_text: str, restoration_map: Dict[str, str]) -> None:
+    found = [match.group(0) for match in _PLACEHOLDER_RE.finditer(protected_text)]
+    # One regex scan settles the common case: every key appears exactly once
+    # as a token, and no other "__" run exists where a second copy could hide.
+    # Anything else takes the per-key counts below for the precise error.
+    if (
+        len(found) == len(restoration_map)
+        and protected_text.count("__") == 2 * len(found)
+        and restoration_map.keys() == set(found)
+    ):
+        return
+
     for placeholder in restoration_map:
         count = protected_text.count(placeholder)
         if count == 0:
@@ -82,8 +131,7 @@ def validate_restoration(protected_text: str, restoration_map: Dict[str, str]) -
                 f"placeholder duplicated: {placeholder} (count={count})"
             )
 
-    for match in _PLACEHOLDER_RE.finditer(protected_text):
-        placeholder = match.group(0)
+    for placeholder in found:
         if placeholder not in restoration_map:
             raise PreservationError(f"unknown placeholder found: {placeholder}")
 
@@ -103,6 +151,28 @@ def validate_url_targets(original: str, restored: str) -> None:
         raise PreservationError("URL target mismatch")
 
 
+def collect_preservation_counts(text: str) -> PreservationCounts:
+    return PreservationCounts(
+        fences=_count_fence_markers(text),
+        math_delimiters=_count_math_delimiters(text),
+        url_targets=tuple(_extract_url_targets(text)),
+    )
+
+
+def compare_preservation_counts(
+    original: PreservationCounts, restored: PreservationCounts
+) -> List[str]:
+    """Return the mismatch messages the ``validate_*`` helpers would raise."""
+    mismatches: List[str] = []
+    if original.fences != restored.fences:
+        mismatches.append("code fence count mismatch")
+    if original.math_delimiters != restored.math_delimiters:
+        mismatches.append("math delimiter count mismatch")
+    if original.url_targets != restored.url_targets:
+        mismatches.append("URL target mismatch")
+    return mismatches
+
+
 def find_protected_spans(text: str) -> List[ProtectedSpan]:
     spans: List[ProtectedSpan] = []
     spans = _append_non_overlapping(spans, _find_fenced_code_spans(text))
@@ -192,11 +262,33 @@ def _apply_spans(
     if not spans:
         return text
 
-    for span in sorted(spans, key=lambda item: item.start, reverse=True):
+    # A span nested in an earlier one (e.g. \begin{aligned} inside
+    # \begin{equation}) is already carried by its parent, so only the
+    # outermost span is kept.
+    ordered: List[ProtectedSpan] = []
+    covered_end = -1
+    for span in sorted(spans, key=lambda item: item.start):
+        if span.start < covered_end:
+            continue
+        ordered.append(span)
+        covered_end = span.end
+
+    # Numbering runs from the last span backwards, as it always has; the text
+    # is then rebuilt in one forward join instead of one copy per span.
+    placeholders: List[str] = []
+    for span in reversed(ordered):
         placeholder = _next_placeholder(kind, counters)
         restoration_map[placeholder] = text[span.start : span.end]
-        text = text[: span.start] + placeholder + text[span.end :]
-    return text
+        placeholders.append(placeholder)
+
+    parts: List[str] = []
+    cursor = 0
+    for span, placeholder in zip(ordered, reversed(placeholders)):
+        parts.append(text[cursor : span.start])
+        parts.append(placeholder)
+        cursor = span.end
+    parts.append(text[cursor:])
+    return "".join(parts)
 
 
 def _next_placeholder(kind: str, counters: Dict[str, int]) -> str:
@@ -257,11 +349,10 @@ def _find_fenced_code_spans(text: str) -> List[ProtectedSpan]:
 
 
 def _is_fence_close(line: str, fence_char: str, fence_len: int) -> bool:
-    line_no_eol = line.rstrip("\r\n")
-    if not line_no_eol:
-        return False
-    pattern = rf"^[ \t]*{re.escape(fence_char)}{{{fence_len},}}[ \t]*$"
-    return re.match(pattern, line_no_eol) is not None
+    # A closing fence is a run of at least fence_len fence characters with
+    # only spaces or tabs around it.
+    marker = line.rstrip("\r\n").strip(" \t")
+    return len(marker) >= fence_len and marker == fence_char * len(marker)
 
 
 def _find_display_dollar_math_spans(text: str) -> List[ProtectedSpan]:
@@ -326,11 +417,11 @@ def _find_begin_end_math_spans(text: str) -> List[ProtectedSpan]:
         start = match.start()
         if _is_escaped(text, start):
             continue
-        env_name = match.group(1)
-        end_match = re.search(rf"\\end\{{{re.escape(env_name)}\}}", text[match.end() :])
-        if not end_match:
+        end_marker = f"\\end{{{match.group(1)}}}"
+        end_start = text.find(end_marker, match.end())
+        if end_start == -1:
             continue
-        end = match.end() + end_match.end()
+        end = end_start + len(end_marker)
         spans.append(ProtectedSpan(start, end, "MATH_BLOCK"))
     return spans
 
@@ -348,6 +439,8 @@ def _find_inline_bracket_math_spans(text: str) -> List[ProtectedSpan]:
             search = index + 2
             while search < len(text) - 1:
                 if text[search] == "\n":
+                    # Unclosed on this line: not math, resume after it.
+                    index = search
                     break
                 if (
                     text[search] == "\\"
@@ -416,9 +509,9 @@ def _looks_like_math(content: str) -> bool:
     stripped = content.strip()
     if not stripped:
         return False
-    if re.search(r"[\\^_=\{\}\[\]<>+\-*/]", stripped):
+    if _MATH_SYMBOL_RE.search(stripped):
         return True
-    if re.search(r"[A-Za-z]", stripped):
+    if _ASCII_LETTER_RE.search(stripped):
         return True
     return False
 
@@ -460,6 +553,8 @@ def _find_inline_code_spans(text: str) -> List[ProtectedSpan]:
 
 
 def _find_url_spans(text: str) -> List[ProtectedSpan]:
+    if "[" not in text:
+        return []
     spans = _find_inline_link_url_spans(text)
     spans.extend(_find_reference_definition_url_spans(text))
     return spans
@@ -587,56 +682,69 @@ def _extract_url_targets(text: str) -> List[str]:
 
 
 def _count_fence_markers(text: str) -> int:
-    return len(_FENCE_LINE_RE.findall(text))
+    # Counts lines opening with a fence run after optional spaces or tabs.
+    # Jumping between marker hits with str.find skips the per-position
+    # attempts a multiline-anchored regex makes across the whole text.
+    count = 0
+    for marker in _FENCE_MARKERS:
+        index = text.find(marker)
+        while index != -1:
+            line_start = text.rfind("\n", 0, index) + 1
+            if not text[line_start:index].strip(" \t"):
+                count += 1
+            line_end = text.find("\n", index)
+            if line_end == -1:
+                break
+            index = text.find(marker, line_end)
+    return count
 
 
 def _count_math_delimiters(text: str) -> Tuple[int, int, int, int, int, int, int, int]:
-    single_dollar, double_dollar = _count_dollar_delimiters(text)
-    open_paren = _count_literal_sequence(text, "\\(")
-    close_paren = _count_literal_sequence(text, "\\)")
-    open_bracket = _count_literal_sequence(text, "\\[")
-    close_bracket = _count_literal_sequence(text, "\\]")
-    begin_env = len(re.findall(r"(?<!\\)\\begin\{[^\}]+\}", text))
-    end_env = len(re.findall(r"(?<!\\)\\end\{[^\}]+\}", text))
-    return (
-        single_dollar,
-        double_dollar,
-        open_paren,
-        close_paren,
-        open_bracket,
-        close_bracket,
-        begin_env,
-        end_env,
-    )
-
-
-def _count_dollar_delimiters(text: str) -> Tuple[int, int]:
-    single = 0
-    double = 0
+    # Every delimiter starts with "$" or a backslash; most prose chunks have
+    # neither, and two substring checks are far cheaper than the regex scans.
+    if "$" not in text and "\\" not in text:
+        return _NO_MATH_DELIMITERS
+    # Slots: single $, $$, \(, \), \[, \], \begin{..}, \end{..}.
+    counts = [0] * 8
     index = 0
-    while index < len(text):
-        if text[index] != "$" or _is_escaped(text, index):
-            index += 1
+    while True:
+        match = _MATH_MARK_RE.search(text, index)
+        if match is None:
+            break
+        token = match.group(0)
+        index = match.end()
+        if token[0] == "$":
+            counts[len(token) - 1] += 1
             continue
-        if index + 1 < len(text) and text[index + 1] == "$":
-            double += 1
-            index += 2
+        mark = token[-1]
+        if mark == "\\":
             continue
-        single += 1
-        index += 1
-    return single, double
-
-
-def _count_literal_sequence(text: str, token: str) -> int:
-    count = 0
-    index = 0
-    while index <= len(text) - len(token):
-        if text[index : index + len(token)] == token and not _is_escaped(text, index):
-            count += 1
-            index += len(token)
-        else:
-            index += 1
-    return count
+        # The mark is escaped when an odd number of backslashes precede it;
+        # for "\(" style tokens the last backslash belongs to the token.
+        backslashes = len(token) - 1
+        if mark == "$":
+            if backslashes % 2 == 0:
+                if text.startswith("$", index):
+                    counts[1] += 1
+                    index += 1
+                else:
+                    counts[0] += 1
+        elif backslashes % 2 == 1:
+            counts[_MATH_MARK_SLOTS[mark]] += 1
+    if "\\begin{" in text:
+        counts[6] = len(_BEGIN_ENV_RE.findall(text))
+    if "\\end{" in text:
+        counts[7] = len(_END_ENV_RE.findall(text))
+    return (
+        counts[0],
+        counts[1],
+        counts[2],
+        counts[3],
+        counts[4],
+        counts[5],
+        counts[6],
+        counts[7],
+    )
 
 
 def _find_matching_bracket(text: str, start_index: int) -> Optional[int]:
@@ -97,39 +97,39 @@ def profile(
         title_hint=title_hint,
     )
     _apply_glossary_defaults(payload)
-    markdown = render_profile_markdown(payload)
+    markdown = _render_profile_markdown_trusted(payload)
     return payload, markdown
 
 
 def render_profile_markdown(payload: Dict[str, object]) -> str:
-    doc = _require_dict(payload, "doc")
-    title = cast(str, doc.get("title", "")).strip() or "Profile"
+    validated = _validate_profile_payload(payload)
+    return _render_profile_markdown_trusted(validated)
 
-    outline = cast(List[object], payload.get("outline", []))
-    glossary = cast(List[object], payload.get("glossary", []))
+
+def _render_profile_markdown_trusted(payload: Dict[str, object]) -> str:
+    # Assumes _validate_profile_payload has already run on this payload.
+    doc = cast(Dict[str, object], payload["doc"])
+    title = cast(str, doc["title"]).strip() or "Profile"
+
+    outline = cast(List[Dict[str, object]], payload["outline"])
+    glossary = cast(List[Dict[str, object]], payload["glossary"])
 
     lines: List[str] = [f"# {title}", "", "## Outline"]
 
     if not outline:
         lines.append("_No outline entries._")
     else:
-        for entry in outline:
-            item = _require_dict(entry, "outline entry")
-            level = _require_int(item.get("level"), "outline.level")
-            heading = _require_str(item.get("heading"), "outline.heading")
-            heading_level = min(6, max(3, level + 2))
-            lines.append(f"{'#' * heading_level} {heading}")
-
-            summary_bullets = _require_str_list(
-                item.get("summary_bullets"), "outline.summary_bullets"
-            )
+        for item in outline:
+            # Validated levels are >= 1, so only the H6 cap is left to apply.
+            heading_level = min(6, cast(int, item["level"]) + 2)
+            lines.append(f"{'#' * heading_level} {item['heading']}")
+
+            summary_bullets = cast(List[str], item["summary_bullets"])
             if summary_bullets:
                 lines.append("- Summary")
                 lines.extend(f"  - {bullet}" for bullet in summary_bullets)
 
-            key_takeaways = _require_str_list(
-                item.get("key_takeaways"), "outline.key_takeaways"
-            )
+            key_takeaways = cast(List[str], item["key_takeaways"])
             if key_takeaways:
                 lines.append("- Key takeaways")
                 lines.extend(f"  - {bullet}" for bullet in key_takeaways)
@@ -145,22 +145,14 @@ def render_profile_markdown(payload: Dict[str, object]) -> str:
     else:
         lines.append("| Term (EN) | Term (ZH) | Note (ZH) | Keep EN First Use |")
         lines.append("| --- | --- | --- | --- |")
-        for entry in glossary:
-            item = _require_dict(entry, "glossary entry")
-            term_en = _require_str(item.get("term_en"), "glossary.term_en")
-            term_zh = _require_str(item.get("term_zh"), "glossary.term_zh")
-            note_zh = _require_str(item.get("note_zh"), "glossary.note_zh")
-            keep_en = _require_bool(
-                item.get("keep_en_on_first_use"), "glossary.keep_en_on_first_use"
-            )
-            keep_value = "true" if keep_en else "false"
+        for item in glossary:
+            term_en = cast(str, item["term_en"])
+            term_zh = cast(str, item["term_zh"])
+            note_zh = cast(str, item["note_zh"])
+            keep_value = "true" if item["keep_en_on_first_use"] else "false"
             lines.append(
-                "| {term_en} | {term_zh} | {note_zh} | {keep_en} |".format(
-                    term_en=_escape_table_cell(term_en),
-                    term_zh=_escape_table_cell(term_zh),
-                    note_zh=_escape_table_cell(note_zh),
-                    keep_en=keep_value,
-                )
+                f"| {_escape_table_cell(term_en)} | {_escape_table_cell(term_zh)}"
+                f" | {_escape_table_cell(note_zh)} | {keep_value} |"
             )
 
     return "\n".join(lines).rstrip() + "\n"
@@ -314,15 +306,24 @@ def _apply_doc_defaults(
 
 
 def _apply_glossary_defaults(payload: Dict[str, object]) -> None:
-    glossary = _require_list(payload.get("glossary"), "glossary")
-    for index, entry in enumerate(glossary):
-        item = _require_dict(entry, f"glossary[{index}]")
-        keep_en = _require_bool(
-            item.get("keep_en_on_first_use"),
-            f"glossary[{index}].keep_en_on_first_use",
-        )
-        if not keep_en:
-            item["keep_en_on_first_use"] = True
+    # Assumes _validate_profile_payload has already run on this payload.
+    glossary = cast(List[Dict[str, object]], payload["glossary"])
+    deduped: List[Dict[str, object]] = []
+    seen: Dict[str, Dict[str, object]] = {}
+    for item in glossary:
+        key = cast(str, item["term_en"]).strip().casefold()
+        kept = seen.get(key)
+        if kept is not None:
+            # Keep the first occurrence, but borrow a note it is missing.
+            note_zh = cast(str, item["note_zh"])
+            if note_zh.strip() and not cast(str, kept["note_zh"]).strip():
+                kept["note_zh"] = note_zh
+            continue
+        item["keep_en_on_first_use"] = True
+        seen[key] = item
+        deduped.append(item)
+    if len(deduped) != len(glossary):
+        payload["glossary"] = deduped
 
 
 def _require_dict(value: object, label: str) -> Dict[str, object]:
@@ -357,5 +358,7 @@ def _require_str_list(value: object, label: str) -> List[str]:
 
 
 def _escape_table_cell(value: str) -> str:
+    if "|" not in value and "\n" not in value:
+        return value
     escaped = value.replace("|", "\\|")
     return escaped.replace("\n", "<br>")
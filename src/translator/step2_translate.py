@@ -1,14 +1,40 @@
 from __future__ import annotations
 
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import asyncio
+import atexit
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 from dataclasses import dataclass
+import functools
+import hashlib
 import os
 import re
-from typing import Dict, List, Optional, Sequence
+import threading
+import time
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
+from openai import RateLimitError
 from openai.types.chat import ChatCompletionMessageParam
 
 from .chunking import ChunkPlanEntry
+from .env import read_env_int
 from .llm_client import KimiClient
 from .validation import (
     require_bool,
@@ -19,17 +45,24 @@ from .validation import (
 )
 from .preservation import (
     PreservationError,
+    collect_preservation_counts,
+    compare_preservation_counts,
     protect,
     restore,
-    validate_fence_counts,
-    validate_math_delimiters,
-    validate_url_targets,
 )
 from .markdown_autofix import autofix_markdown
 
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional accelerator
+    ahocorasick = None
+
 
 _PLACEHOLDER_TOKEN_RE = r"__([A-Z][A-Z_]*)_[0-9]{3}__"
 _PLACEHOLDER_RE = re.compile(rf"(?<![_A-Za-z0-9]){_PLACEHOLDER_TOKEN_RE}")
+# Same tokens without the look-behind, which keeps the literal "__" prefix
+# the regex engine can scan for quickly; callers check the look-behind.
+_PLACEHOLDER_SCAN_RE = re.compile(_PLACEHOLDER_TOKEN_RE)
 _PLACEHOLDER_BACKTICK_RE = re.compile(rf"`+(?P<token>{_PLACEHOLDER_TOKEN_RE})`+")
 _PLACEHOLDER_FENCED_BLOCK_RE = re.compile(
     "".join(
@@ -41,47 +74,245 @@ _PLACEHOLDER_FENCED_BLOCK_RE = re.compile(
     )
 )
 
+_PROMPT_MARKER_LINE_RE = re.compile(r"^[ \t]*(<<<|>>>)\s*$\n?", re.MULTILINE)
+_PROMPT_MARKER_HEADING_RE = re.compile(r"^[ \t]*(<<<|>>>)\s*(#+\s*)", re.MULTILINE)
+_HR_HEADING_RE = re.compile(r"^([=]{3,}|[-]{3,})\s*(#{1,6}\s+)", re.MULTILINE)
+_BLOCKQUOTE_HEADING_RE = re.compile(r"^(>[^\n]*?)(#{1,6}\s+)", re.MULTILINE)
+_LIST_HEADING_RE = re.compile(r"^([ \t]*[-*+]\s+[^\n]*?)(#{1,6}\s+)", re.MULTILINE)
+_OL_HEADING_RE = re.compile(r"^([ \t]*\d+[.)]\s+[^\n]*?)(#{1,6}\s+)", re.MULTILINE)
+_SENTENCE_HEADING_RE = re.compile(r"([.!?。！？\]\)])\s*(#{2,6}\s+)")
+_SPACE_RUN_RE = re.compile(r" {2,}")
+# Hyphens and every str.isspace() code point (none lie above U+3000) map to a
+# plain space, so normalization is one translate() plus one run collapse.
+_GLOSSARY_SPACE_TABLE = str.maketrans(
+    dict.fromkeys(
+        ["-"] + [chr(code) for code in range(0x3001) if chr(code).isspace()], " "
+    )
+)
+_NONWORD_SPACE_RE = re.compile(r"[^\w\s]")
+_ALNUM_RE = re.compile(r"[a-z0-9]+")
+# ASCII text is tokenized by mapping every byte outside [a-z0-9] to a space.
+_ASCII_TOKEN_TABLE = bytes(
+    code if chr(code) in "abcdefghijklmnopqrstuvwxyz0123456789" else 0x20
+    for code in range(256)
+)
 
-def _read_env_int(name: str, default: int) -> int:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    raw = raw.strip()
-    if not raw:
-        return default
-    try:
-        value = int(raw)
-    except ValueError:
-        return default
-    if value < 0:
-        return default
-    return value
 
+_GLOSSARY_TABLE_HEADER = (
+    "| term_en | term_zh | note_zh | keep_en_on_first_use |",
+    "| --- | --- | --- | --- |",
+)
+_STEP2_SYSTEM_PROMPT = (
+    "You are a technical translation assistant for study notes. "
+    "Output ONLY Markdown. Do not wrap output in JSON or code fences. "
+    "Preserve all placeholders and Markdown structure exactly."
+)
+_STEP2_REQUIREMENT_LINES = (
+    "Requirements:",
+    "- Output Markdown only; no JSON wrapper, no extra commentary.",
+    "- Preserve Markdown structure, links, math, code fences, and inline code.",
+    "- NEVER convert inline code (`backticks`) into fenced code blocks (```). Keep `code` as `code`.",
+    "- Do not translate or modify placeholder tokens like __CODE_BLOCK_001__.",
+    "- Term style: 首次出现使用 `中文（English）`，后续只用中文。",
+    "- Annotation density: medium (key explanation + 1 example/analogy).",
+    "- Annotation format: `> **学习批注：** ...` or `> **背景扩展：** ...`.",
+    "- Glossary enforcement is soft: prefer glossary terms when relevant.",
+)
 
-_MAX_GLOSSARY_TERMS_PER_CHUNK = _read_env_int("TRANSLATOR_GLOSSARY_MAX_TERMS", 30)
-_MAX_GLOSSARY_CHARS_PER_CHUNK = _read_env_int("TRANSLATOR_GLOSSARY_MAX_CHARS", 2000)
+
+_MAX_GLOSSARY_TERMS_PER_CHUNK = read_env_int("TRANSLATOR_GLOSSARY_MAX_TERMS", 30)
+_MAX_GLOSSARY_CHARS_PER_CHUNK = read_env_int("TRANSLATOR_GLOSSARY_MAX_CHARS", 2000)
+# Below this many entries per-entry substring checks beat an automaton pass.
+_GLOSSARY_AUTOMATON_MIN_ENTRIES = 8
 _GLOSSARY_MODES = {"filtered", "full"}
+# Chunks are packed into one request until their combined source length would
+# exceed this budget; 0 keeps one request per chunk.
+_BATCH_MAX_CHARS = read_env_int("TRANSLATOR_BATCH_MAX_CHARS", 0)
+_BATCH_SEPARATOR = "%%%%%%"
+_BATCH_SEPARATOR_RE = re.compile(r"^[ \t]*%%%%%%[ \t]*$", re.MULTILINE)
+# Worker threads are reused across translate_chunks calls; see _get_executor.
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_WORKERS = 0
+_EXECUTOR_LOCK = threading.Lock()
+# A throttled batch is resent after this delay, doubled for each throttle in a
+# row and reset by the next success.
+_RATE_LIMIT_BACKOFF_INITIAL = 1.0
+_RATE_LIMIT_BACKOFF_MAX = 30.0
+_BATCH_HEADER_RE = re.compile(r"\A\s*=== CHUNK \d+ ===[ \t]*\n")
+_BATCH_HEADER_LINE_RE = re.compile(r"^[ \t]*=== CHUNK (\d+) ===[ \t]*$", re.MULTILINE)
+# Opt-in: translations of identical chunks (same prompt inputs and model) are
+# reused, warnings included, instead of asking the model again; 0 disables it.
+_TRANSLATION_CACHE_SIZE = read_env_int("TRANSLATOR_TRANSLATION_CACHE_SIZE", 0)
+_TRANSLATION_CACHE: "OrderedDict[bytes, Tuple[str, Tuple[str, ...]]]" = OrderedDict()
+_TRANSLATION_CACHE_LOCK = threading.Lock()
 
 
 class Step2TranslateError(RuntimeError):
     pass
 
 
+class Step2RateLimitError(Step2TranslateError):
+    """Raised once the provider still throttles requests at a window of one."""
+
+
 @dataclass(frozen=True)
 class ChunkTranslation:
     chunk_id: str
     index: int
     text: str
-    warnings: List[str]
+    warnings: Tuple[str, ...]
 
 
-def _strip_unknown_placeholders(text: str, restoration_map: Dict[str, str]) -> str:
-    known = set(restoration_map.keys())
-    return _PLACEHOLDER_RE.sub(
-        lambda m: m.group(0) if m.group(0) in known else "", text
+@dataclass(frozen=True)
+class _OutlineEntry:
+    level: int
+    heading: str
+    summary_bullets: Tuple[str, ...]
+    key_takeaways: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _ValidatedOutline(Sequence[Dict[str, object]]):
+    """Outline checked once for one prompt mode.
+
+    Behaves as a sequence of the original entry dicts; ``entries`` holds the
+    fields the prompt uses for ``mode`` and ``block`` their rendered form.
+    """
+
+    items: Tuple[Dict[str, object], ...]
+    mode: str
+    entries: Tuple[_OutlineEntry, ...]
+    block: str
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self.items[index]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+@dataclass(frozen=True)
+class _GlossaryEntry:
+    term_en: str
+    term_zh: str
+    note_zh: str
+    keep_en_on_first_use: bool
+
+
+@dataclass(frozen=True)
+class _GlossarySelection(Sequence[Dict[str, object]]):
+    """Glossary entry dicts paired with their validated fields.
+
+    Behaves as a sequence of the original entry dicts, so it can be passed
+    anywhere a glossary is expected. ``literal_terms`` holds every English
+    and Chinese form of the document glossary the selection was drawn from.
+    """
+
+    items: Tuple[Dict[str, object], ...]
+    entries: Tuple[_GlossaryEntry, ...]
+    literal_terms: Tuple[str, ...]
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self.items[index]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+@dataclass(frozen=True)
+class _GlossaryIndex(_GlossarySelection):
+    """Validated glossary with each term's matching forms computed once."""
+
+    terms_normalized: Tuple[str, ...]
+    token_sets: Tuple[FrozenSet[str], ...]
+    plain_terms: Tuple[bool, ...]
+    entry_chars: Tuple[int, ...]
+    unique_terms: Tuple[str, ...]
+    total_chars: int
+    min_match_chars: int
+
+
+def _build_glossary_index(glossary: Sequence[Dict[str, object]]) -> _GlossaryIndex:
+    if isinstance(glossary, _GlossaryIndex):
+        return glossary
+    items: List[Dict[str, object]] = []
+    entries: List[_GlossaryEntry] = []
+    terms_normalized: List[str] = []
+    token_sets: List[FrozenSet[str]] = []
+    plain_terms: List[bool] = []
+    entry_chars: List[int] = []
+    literal_terms: Set[str] = set()
+    for index, entry in enumerate(glossary):
+        item, parsed = _parse_glossary_entry(entry, index)
+        term_normalized, term_token_set, is_plain = _glossary_term_forms(
+            parsed.term_en
+        )
+        items.append(item)
+        entries.append(parsed)
+        terms_normalized.append(term_normalized)
+        token_sets.append(term_token_set)
+        plain_terms.append(is_plain)
+        entry_chars.append(
+            len(parsed.term_en) + len(parsed.term_zh) + len(parsed.note_zh)
+        )
+        literal_terms.update(
+            term for term in (parsed.term_en, parsed.term_zh) if term
+        )
+    return _GlossaryIndex(
+        items=tuple(items),
+        entries=tuple(entries),
+        literal_terms=tuple(sorted(literal_terms)),
+        terms_normalized=tuple(terms_normalized),
+        token_sets=tuple(token_sets),
+        plain_terms=tuple(plain_terms),
+        entry_chars=tuple(entry_chars),
+        unique_terms=tuple(sorted({term for term in terms_normalized if term})),
+        total_chars=sum(entry_chars),
+        min_match_chars=min(
+            (
+                _min_match_chars(term, token_set)
+                for term, token_set in zip(terms_normalized, token_sets)
+                if term
+            ),
+            default=0,
+        ),
     )
 
 
+def _min_match_chars(term_normalized: str, token_set: FrozenSet[str]) -> int:
+    # Lower bound on the normalized chunk length needed for the term to match.
+    if len(token_set) < 2:
+        return len(term_normalized)
+    # Token overlap needs at least half of the term's distinct tokens, and
+    # chunk tokens are disjoint runs, so their lengths add up.
+    needed = (len(token_set) + 1) // 2
+    shortest = sorted(len(token) for token in token_set)[:needed]
+    return min(len(term_normalized), sum(shortest))
+
+
+def _strip_unknown_placeholders(text: str, restoration_map: Dict[str, str]) -> str:
+    pieces: List[str] = []
+    last = 0
+    for match in _PLACEHOLDER_SCAN_RE.finditer(text):
+        if match.group(0) in restoration_map:
+            continue
+        start = match.start()
+        if start and _is_ascii_word_char(text[start - 1]):
+            # Not a placeholder by _PLACEHOLDER_RE's look-behind.
+            continue
+        pieces.append(text[last:start])
+        last = match.end()
+    if not pieces:
+        # Nothing to strip: hand back the original string without copying.
+        return text
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
+def _is_ascii_word_char(char: str) -> bool:
+    return char == "_" or (char.isascii() and char.isalnum())
+
+
 def _strip_placeholder_backticks(text: str) -> str:
     text = _PLACEHOLDER_BACKTICK_RE.sub(lambda m: m.group("token"), text)
     return _PLACEHOLDER_FENCED_BLOCK_RE.sub(
@@ -90,8 +321,8 @@ def _strip_placeholder_backticks(text: str) -> str:
 
 
 def _strip_prompt_markers(text: str) -> str:
-    cleaned = re.sub(r"^[ \t]*(<<<|>>>)\s*$\n?", "", text, flags=re.MULTILINE)
-    return re.sub(r"^[ \t]*(<<<|>>>)\s*(#+\s*)", r"\2", cleaned, flags=re.MULTILINE)
+    cleaned = _PROMPT_MARKER_LINE_RE.sub("", text)
+    return _PROMPT_MARKER_HEADING_RE.sub(r"\2", cleaned)
 
 
 # Regex: fenced block with single short line appearing inline = LLM-expanded inline code
@@ -154,66 +385,119 @@ def _fix_inline_fenced_code(text: str) -> str:
 
 
 def _fix_heading_collisions(text: str) -> str:
-    text = re.sub(
-        r"^([=]{3,}|[-]{3,})\s*(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    text = re.sub(
-        r"^(>[^\n]*?)(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    text = re.sub(
-        r"^([ \t]*[-*+]\s+[^\n]*?)(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    text = re.sub(
-        r"^([ \t]*\d+[.)]\s+[^\n]*?)(#{1,6}\s+)",
-        r"\1\n\2",
-        text,
-        flags=re.MULTILINE,
-    )
-    return re.sub(
-        r"([.!?。！？\]\)])\s*(#{2,6}\s+)",
-        r"\1\n\2",
-        text,
-    )
+    for pattern in (
+        _HR_HEADING_RE,
+        _BLOCKQUOTE_HEADING_RE,
+        _LIST_HEADING_RE,
+        _OL_HEADING_RE,
+        _SENTENCE_HEADING_RE,
+    ):
+        text = pattern.sub(r"\1\n\2", text)
+    return text
 
 
 def _normalize_glossary_text(value: str) -> str:
-    normalized = value.casefold().replace("-", " ")
-    normalized = re.sub(r"\s+", " ", normalized)
-    return normalized.strip()
+    normalized = value.casefold().translate(_GLOSSARY_SPACE_TABLE)
+    return _SPACE_RUN_RE.sub(" ", normalized).strip()
 
 
 def _tokenize_glossary_text(value: str) -> List[str]:
     normalized = _normalize_glossary_text(value)
     if not normalized:
         return []
-    return re.findall(r"[a-z0-9]+", normalized)
+    return _alnum_tokens(normalized)
+
+
+def _alnum_tokens(normalized: str) -> List[str]:
+    if normalized.isascii():
+        return (
+            normalized.encode("ascii")
+            .translate(_ASCII_TOKEN_TABLE)
+            .decode("ascii")
+            .split()
+        )
+    return _ALNUM_RE.findall(normalized)
 
 
 def _has_exact_phrase(term_normalized: str, chunk_normalized: str) -> bool:
+    # A \b-delimited match is also a substring match, so containment decides.
     if not term_normalized:
         return False
-    pattern = r"\b" + re.escape(term_normalized) + r"\b"
-    if re.search(pattern, chunk_normalized):
-        return True
     return term_normalized in chunk_normalized
 
 
 def _has_word_boundary(term_normalized: str, chunk_normalized: str) -> bool:
     if not term_normalized:
         return False
-    if re.search(r"[^\w\s]", term_normalized):
+    if _NONWORD_SPACE_RE.search(term_normalized):
         return term_normalized in chunk_normalized
-    pattern = r"\b" + re.escape(term_normalized) + r"\b"
-    return re.search(pattern, chunk_normalized) is not None
+    # Plain terms start and end with word characters, so \b on each side
+    # reduces to checking the neighbouring characters of each occurrence.
+    term_len = len(term_normalized)
+    chunk_len = len(chunk_normalized)
+    start = chunk_normalized.find(term_normalized)
+    while start != -1:
+        end = start + term_len
+        if (start == 0 or not _is_word_char(chunk_normalized[start - 1])) and (
+            end == chunk_len or not _is_word_char(chunk_normalized[end])
+        ):
+            return True
+        start = chunk_normalized.find(term_normalized, start + 1)
+    return False
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+@functools.lru_cache(maxsize=4096)
+def _glossary_term_forms(term_en: str) -> Tuple[str, FrozenSet[str], bool]:
+    term_normalized = _normalize_glossary_text(term_en)
+    term_tokens = frozenset(_tokenize_glossary_text(term_en))
+    is_plain = _NONWORD_SPACE_RE.search(term_normalized) is None
+    return term_normalized, term_tokens, is_plain
+
+
+@functools.lru_cache(maxsize=8)
+def _build_glossary_automaton(terms: Tuple[str, ...]) -> Any:
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        _ = automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
+
+
+def _scan_glossary_terms(
+    unique_terms: Tuple[str, ...], chunk_normalized: str
+) -> Tuple[Set[str], Set[str]]:
+    """Return the terms found in the chunk, and those found on word boundaries."""
+    present: Set[str] = set()
+    bounded: Set[str] = set()
+    if not unique_terms:
+        return present, bounded
+
+    if ahocorasick is None:
+        for term in unique_terms:
+            if _has_exact_phrase(term, chunk_normalized):
+                present.add(term)
+                if _has_word_boundary(term, chunk_normalized):
+                    bounded.add(term)
+        return present, bounded
+
+    automaton = _build_glossary_automaton(unique_terms)
+    chunk_len = len(chunk_normalized)
+    for end_index, term in automaton.iter(chunk_normalized):
+        start = end_index - len(term) + 1
+        present.add(term)
+        if term in bounded:
+            continue
+        left_ok = start == 0 or not _is_word_char(chunk_normalized[start - 1])
+        right_ok = end_index + 1 == chunk_len or not _is_word_char(
+            chunk_normalized[end_index + 1]
+        )
+        if left_ok and right_ok:
+            bounded.add(term)
+    return present, bounded
 
 
 def _filter_glossary_for_chunk(
@@ -221,7 +505,7 @@ def _filter_glossary_for_chunk(
     chunk_text: str,
     max_terms: int = _MAX_GLOSSARY_TERMS_PER_CHUNK,
     max_chars: int = _MAX_GLOSSARY_CHARS_PER_CHUNK,
-) -> List[Dict[str, object]]:
+) -> Sequence[Dict[str, object]]:
     if not glossary or not chunk_text:
         return []
     if max_terms <= 0 or max_chars <= 0:
@@ -230,48 +514,64 @@ def _filter_glossary_for_chunk(
     chunk_normalized = _normalize_glossary_text(chunk_text)
     if not chunk_normalized:
         return []
-    chunk_tokens = set(re.findall(r"[a-z0-9]+", chunk_normalized))
+    index_data = _build_glossary_index(glossary)
+    if not index_data.unique_terms:
+        return []
+    if len(chunk_normalized) < index_data.min_match_chars:
+        return []
+    chunk_tokens = set(_alnum_tokens(chunk_normalized))
 
-    candidates: List[tuple[int, int, Dict[str, object], int]] = []
-    for index, entry in enumerate(glossary):
-        item = _require_dict(entry, f"glossary[{index}]")
-        term_en = _require_str(item.get("term_en"), f"glossary[{index}].term_en")
-        term_zh = _require_str(item.get("term_zh"), f"glossary[{index}].term_zh")
-        note_zh = _require_str(item.get("note_zh"), f"glossary[{index}].note_zh")
+    present, bounded = _scan_glossary_terms(index_data.unique_terms, chunk_normalized)
 
-        term_tokens = _tokenize_glossary_text(term_en)
-        term_token_set = set(term_tokens)
-        term_normalized = _normalize_glossary_text(term_en)
+    # Priorities 1-3 map to buckets 0-2; appending in glossary order keeps the
+    # tie-break on index without sorting.
+    buckets: Tuple[List[Tuple[int, int]], ...] = ([], [], [])
+    for index in range(len(index_data)):
+        term_normalized = index_data.terms_normalized[index]
+        term_token_set = index_data.token_sets[index]
 
         priority: Optional[int] = None
         if len(term_token_set) >= 2:
-            if _has_exact_phrase(term_normalized, chunk_normalized):
+            if term_normalized in present:
                 priority = 1
             else:
                 overlap = len(term_token_set.intersection(chunk_tokens))
                 if term_token_set and overlap / len(term_token_set) >= 0.5:
                     priority = 3
         else:
-            if _has_word_boundary(term_normalized, chunk_normalized):
+            hits = bounded if index_data.plain_terms[index] else present
+            if term_normalized in hits:
                 priority = 2
 
         if priority is None:
             continue
 
-        entry_chars = len(term_en) + len(term_zh) + len(note_zh)
-        candidates.append((priority, index, item, entry_chars))
+        buckets[priority - 1].append((index, index_data.entry_chars[index]))
 
-    candidates.sort(key=lambda item: (item[0], item[1]))
-    filtered: List[Dict[str, object]] = []
+    candidates = buckets[0] + buckets[1] + buckets[2]
+    if len(candidates) <= max_terms and index_data.total_chars <= max_chars:
+        # The whole glossary fits the budget, so every candidate is kept.
+        return _select_glossary_entries(index_data, [index for index, _ in candidates])
+    selected: List[int] = []
     total_chars = 0
-    for _, _, entry, entry_chars in candidates:
-        if len(filtered) >= max_terms:
+    for index, entry_chars in candidates:
+        if len(selected) >= max_terms:
             break
         if total_chars + entry_chars > max_chars:
             continue
-        filtered.append(entry)
+        selected.append(index)
         total_chars += entry_chars
-    return filtered
+    return _select_glossary_entries(index_data, selected)
+
+
+def _select_glossary_entries(
+    index_data: _GlossaryIndex, positions: Sequence[int]
+) -> _GlossarySelection:
+    return _GlossarySelection(
+        items=tuple(index_data.items[index] for index in positions),
+        entries=tuple(index_data.entries[index] for index in positions),
+        literal_terms=index_data.literal_terms,
+    )
 
 
 def translate_chunk(
@@ -287,27 +587,173 @@ def translate_chunk(
     glossary_mode: str = "filtered",
 ) -> ChunkTranslation:
     if not chunk_text:
-        return ChunkTranslation(chunk_id=chunk_id, index=index, text="", warnings=[])
-    if glossary_mode not in _GLOSSARY_MODES:
-        raise Step2TranslateError("glossary_mode must be 'filtered' or 'full'")
+        return ChunkTranslation(chunk_id=chunk_id, index=index, text="", warnings=())
+    glossary_for_chunk = _select_chunk_glossary(chunk_text, glossary, glossary_mode)
+    llm_client = client or KimiClient()
+    cache_key = _translation_cache_key(
+        chunk_text,
+        outline,
+        glossary_for_chunk,
+        client=llm_client,
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+    )
+    cached = _cached_translation(cache_key, chunk_id=chunk_id, index=index)
+    if cached is not None:
+        return cached
+    protected_text, restoration_map = protect(chunk_text)
 
-    glossary_for_chunk = glossary
-    if glossary_mode == "filtered":
-        glossary_for_chunk = _filter_glossary_for_chunk(glossary, chunk_text)
+    translated = _translate_with_placeholder_retries(
+        client=llm_client,
+        outline=outline,
+        glossary=glossary_for_chunk,
+        protected_chunk=protected_text,
+        expected_placeholders=list(restoration_map),
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+    )
+    result = _finalize_chunk(
+        chunk_text,
+        translated,
+        restoration_map,
+        glossary_for_chunk,
+        chunk_id=chunk_id,
+        index=index,
+    )
+    _store_translation(cache_key, result)
+    return result
 
-    protected_text, restoration_map = protect(chunk_text)
+
+async def atranslate_chunk(
+    chunk_text: str,
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    *,
+    client: Optional[KimiClient] = None,
+    chunk_id: str = "",
+    index: int = 0,
+    style_rules: Optional[Sequence[str]] = None,
+    prompt_outline_mode: str = "headings",
+    glossary_mode: str = "filtered",
+) -> ChunkTranslation:
+    if not chunk_text:
+        return ChunkTranslation(chunk_id=chunk_id, index=index, text="", warnings=())
+    glossary_for_chunk = _select_chunk_glossary(chunk_text, glossary, glossary_mode)
     llm_client = client or KimiClient()
-    expected_placeholders = sorted(restoration_map.keys())
-    translated = _translate_with_placeholder_retries(
+    cache_key = _translation_cache_key(
+        chunk_text,
+        outline,
+        glossary_for_chunk,
+        client=llm_client,
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+    )
+    cached = _cached_translation(cache_key, chunk_id=chunk_id, index=index)
+    if cached is not None:
+        return cached
+    protected_text, restoration_map = protect(chunk_text)
+
+    translated = await _atranslate_with_placeholder_retries(
         client=llm_client,
         outline=outline,
         glossary=glossary_for_chunk,
         protected_chunk=protected_text,
-        expected_placeholders=expected_placeholders,
+        expected_placeholders=list(restoration_map),
         style_rules=style_rules,
         prompt_outline_mode=prompt_outline_mode,
     )
+    result = _finalize_chunk(
+        chunk_text,
+        translated,
+        restoration_map,
+        glossary_for_chunk,
+        chunk_id=chunk_id,
+        index=index,
+    )
+    _store_translation(cache_key, result)
+    return result
+
+
+def _select_chunk_glossary(
+    chunk_text: str,
+    glossary: Sequence[Dict[str, object]],
+    glossary_mode: str,
+) -> Sequence[Dict[str, object]]:
+    if glossary_mode not in _GLOSSARY_MODES:
+        raise Step2TranslateError("glossary_mode must be 'filtered' or 'full'")
+    if glossary_mode == "filtered":
+        return _filter_glossary_for_chunk(glossary, chunk_text)
+    return glossary
+
+
+def _translation_cache_key(
+    chunk_text: str,
+    outline: Sequence[Dict[str, object]],
+    glossary_for_chunk: Sequence[Dict[str, object]],
+    *,
+    client: object,
+    style_rules: Optional[Sequence[str]],
+    prompt_outline_mode: str,
+) -> Optional[bytes]:
+    # None means "do not cache": the cache is off, or the client does not say
+    # which model answers, so entries could not be kept apart by model.
+    if _TRANSLATION_CACHE_SIZE <= 0:
+        return None
+    model = getattr(client, "model", None)
+    if not isinstance(model, str) or not model:
+        return None
+    # The rendered prompt blocks are already cached, and they capture exactly
+    # what the model sees besides the chunk itself.
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+        f"{type(client).__module__}.{type(client).__qualname__}:{model}",
+        chunk_text,
+        _render_condensed_outline(outline, prompt_outline_mode),
+        _render_glossary(glossary_for_chunk),
+        _render_style_rules(style_rules),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def _cached_translation(
+    cache_key: Optional[bytes], *, chunk_id: str, index: int
+) -> Optional[ChunkTranslation]:
+    if cache_key is None:
+        return None
+    with _TRANSLATION_CACHE_LOCK:
+        entry = _TRANSLATION_CACHE.get(cache_key)
+        if entry is None:
+            return None
+        _TRANSLATION_CACHE.move_to_end(cache_key)
+    text, warnings = entry
+    return ChunkTranslation(
+        chunk_id=chunk_id, index=index, text=text, warnings=warnings
+    )
 
+
+def _store_translation(
+    cache_key: Optional[bytes], result: ChunkTranslation
+) -> None:
+    if cache_key is None:
+        return
+    with _TRANSLATION_CACHE_LOCK:
+        _TRANSLATION_CACHE[cache_key] = (result.text, result.warnings)
+        _TRANSLATION_CACHE.move_to_end(cache_key)
+        while len(_TRANSLATION_CACHE) > _TRANSLATION_CACHE_SIZE:
+            _ = _TRANSLATION_CACHE.popitem(last=False)
+
+
+def _finalize_chunk(
+    chunk_text: str,
+    translated: str,
+    restoration_map: Dict[str, str],
+    glossary_for_chunk: Sequence[Dict[str, object]],
+    *,
+    chunk_id: str,
+    index: int,
+) -> ChunkTranslation:
     try:
         cleaned = _strip_placeholder_backticks(translated)
         cleaned = _strip_unknown_placeholders(cleaned, restoration_map)
@@ -322,8 +768,8 @@ def translate_chunk(
     qa_warnings = _validate_restored_chunk(
         original=chunk_text, restored=cleaned_restored
     )
-    warnings = qa_warnings + _collect_glossary_warnings(
-        cleaned_restored, glossary_for_chunk
+    warnings = tuple(
+        qa_warnings + _collect_glossary_warnings(cleaned_restored, glossary_for_chunk)
     )
     return ChunkTranslation(
         chunk_id=chunk_id, index=index, text=cleaned_restored, warnings=warnings
@@ -337,48 +783,534 @@ def translate_chunks(
     *,
     client: Optional[KimiClient] = None,
     concurrency: int = 3,
+    max_concurrency: Optional[int] = None,
+    style_rules: Optional[Sequence[str]] = None,
+    prompt_outline_mode: str = "headings",
+    glossary_mode: str = "filtered",
+    batch_max_chars: int = _BATCH_MAX_CHARS,
+    executor: Optional[Executor] = None,
+) -> List[ChunkTranslation]:
+    return list(
+        iter_translate_chunks(
+            chunks,
+            outline,
+            glossary,
+            client=client,
+            concurrency=concurrency,
+            max_concurrency=max_concurrency,
+            style_rules=style_rules,
+            prompt_outline_mode=prompt_outline_mode,
+            glossary_mode=glossary_mode,
+            batch_max_chars=batch_max_chars,
+            executor=executor,
+        )
+    )
+
+
+def iter_translate_chunks(
+    chunks: Sequence[ChunkPlanEntry],
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    *,
+    client: Optional[KimiClient] = None,
+    concurrency: int = 3,
+    max_concurrency: Optional[int] = None,
+    style_rules: Optional[Sequence[str]] = None,
+    prompt_outline_mode: str = "headings",
+    glossary_mode: str = "filtered",
+    batch_max_chars: int = _BATCH_MAX_CHARS,
+    executor: Optional[Executor] = None,
+) -> Iterator[ChunkTranslation]:
+    """Yield chunk translations in chunk order as soon as each one is ready.
+
+    Up to ``concurrency`` requests start in flight. The window grows by one
+    after each window's worth of successes, up to ``max_concurrency``
+    (default: ``concurrency``), and halves when a request is rate limited;
+    the throttled batch is retried after a backoff unless the window is
+    already at one, in which case ``Step2RateLimitError`` is raised. Results
+    that finish ahead of an earlier chunk are held back until the gap is
+    filled. Requests run on ``executor`` when given, otherwise on a
+    module-wide thread pool shared by every call.
+    """
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    if max_concurrency is None:
+        max_concurrency = concurrency
+    if max_concurrency < concurrency:
+        raise ValueError("max_concurrency must be at least concurrency")
+    if not chunks:
+        return
+
+    outline = _validate_outline(outline, prompt_outline_mode)
+    glossary = _build_glossary_index(glossary)
+    # One client for every worker: its connection pool stays warm across chunks.
+    llm_client = client or KimiClient()
+    if executor is None:
+        executor = _get_executor(max_concurrency)
+    window = _ConcurrencyWindow(concurrency, max_concurrency)
+    pending = deque(_plan_batches(chunks, batch_max_chars))
+    in_flight: Dict[Future[List[ChunkTranslation]], List[int]] = {}
+    ready: Dict[int, ChunkTranslation] = {}
+    next_index = 0
+
+    def submit(batch: List[int]) -> None:
+        future = executor.submit(
+            _translate_chunk_batch,
+            [(index, chunks[index]) for index in batch],
+            outline,
+            glossary,
+            client=llm_client,
+            style_rules=style_rules,
+            prompt_outline_mode=prompt_outline_mode,
+            glossary_mode=glossary_mode,
+        )
+        in_flight[future] = batch
+
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < window.size:
+                submit(pending.popleft())
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    translated = future.result()
+                except RateLimitError as exc:
+                    if window.size == 1:
+                        raise _batch_error(chunks, batch, exc) from exc
+                    pending.appendleft(batch)
+                    time.sleep(window.shrink())
+                    continue
+                except Exception as exc:
+                    raise _batch_error(chunks, batch, exc) from exc
+                window.grow()
+                for index, item in zip(batch, translated):
+                    ready[index] = item
+            while next_index in ready:
+                yield ready.pop(next_index)
+                next_index += 1
+    finally:
+        for future in in_flight:
+            _ = future.cancel()
+
+    if next_index != len(chunks):
+        raise Step2TranslateError("missing chunk translation result")
+
+
+class _ConcurrencyWindow:
+    """Additive-increase / multiplicative-decrease cap on in-flight batches."""
+
+    def __init__(self, initial: int, maximum: int) -> None:
+        self.size = initial
+        self._maximum = maximum
+        self._successes = 0
+        self._throttled = 0
+
+    def grow(self) -> None:
+        self._throttled = 0
+        self._successes += 1
+        if self._successes >= self.size and self.size < self._maximum:
+            self.size += 1
+            self._successes = 0
+
+    def shrink(self) -> float:
+        """Halve the window; return the seconds to wait before resending."""
+        self.size = max(1, self.size // 2)
+        self._successes = 0
+        delay = min(
+            _RATE_LIMIT_BACKOFF_MAX,
+            _RATE_LIMIT_BACKOFF_INITIAL * 2**self._throttled,
+        )
+        self._throttled += 1
+        return delay
+
+
+def _get_executor(min_workers: int) -> ThreadPoolExecutor:
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None or _EXECUTOR_WORKERS < min_workers:
+            # A smaller pool being replaced stays up: running generators keep
+            # submitting to it, and its idle threads exit once it is dropped.
+            workers = max(min_workers, (os.cpu_count() or 1) * 2)
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="step2-translate"
+            )
+            _EXECUTOR_WORKERS = workers
+        return _EXECUTOR
+
+
+def _shutdown_executor() -> None:
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False)
+        _EXECUTOR = None
+        _EXECUTOR_WORKERS = 0
+
+
+_ = atexit.register(_shutdown_executor)
+
+
+def _plan_batches(
+    chunks: Sequence[ChunkPlanEntry], max_chars: int
+) -> List[List[int]]:
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+    for index, chunk in enumerate(chunks):
+        size = len(chunk.source_text)
+        if current and (max_chars <= 0 or current_chars + size > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(index)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+@dataclass(frozen=True)
+class _BatchPlan:
+    entries: Sequence[Tuple[int, ChunkPlanEntry]]
+    cached: Dict[int, ChunkTranslation]
+    cache_keys: Dict[int, Optional[bytes]]
+    prepared: Dict[int, Tuple[Sequence[Dict[str, object]], str, Dict[str, str]]]
+    messages: Optional[List[ChatCompletionMessageParam]]
+
+
+def _translate_chunk_batch(
+    entries: Sequence[Tuple[int, ChunkPlanEntry]],
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    *,
+    client: KimiClient,
+    style_rules: Optional[Sequence[str]],
+    prompt_outline_mode: str,
+    glossary_mode: str,
+) -> List[ChunkTranslation]:
+    plan = _plan_chunk_batch(
+        entries,
+        outline,
+        glossary,
+        client=client,
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+        glossary_mode=glossary_mode,
+    )
+    parts: Dict[int, str] = {}
+    if plan.messages is not None:
+        parts = _batch_response_parts(
+            plan, client.chat_completion(plan.messages, json_mode=False)
+        )
+    results: List[ChunkTranslation] = []
+    for index, chunk in plan.entries:
+        if index not in plan.prepared:
+            results.append(_unbatched_result(plan, index, chunk))
+            continue
+        glossary_for_chunk, protected_text, restoration_map = plan.prepared[index]
+        translated = parts.get(index)
+        if _batch_part_incomplete(translated, restoration_map):
+            # Only chunks the batch reply failed to carry intact pay for a retry.
+            translated = _translate_with_placeholder_retries(
+                client=client,
+                outline=outline,
+                glossary=glossary_for_chunk,
+                protected_chunk=protected_text,
+                expected_placeholders=list(restoration_map),
+                style_rules=style_rules,
+                prompt_outline_mode=prompt_outline_mode,
+            )
+        results.append(_finish_batch_part(plan, index, chunk, translated))
+    return results
+
+
+async def _atranslate_chunk_batch(
+    entries: Sequence[Tuple[int, ChunkPlanEntry]],
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    *,
+    client: KimiClient,
+    style_rules: Optional[Sequence[str]],
+    prompt_outline_mode: str,
+    glossary_mode: str,
+) -> List[ChunkTranslation]:
+    plan = _plan_chunk_batch(
+        entries,
+        outline,
+        glossary,
+        client=client,
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+        glossary_mode=glossary_mode,
+    )
+    parts: Dict[int, str] = {}
+    if plan.messages is not None:
+        parts = _batch_response_parts(
+            plan, await client.achat_completion(plan.messages, json_mode=False)
+        )
+    results: List[ChunkTranslation] = []
+    for index, chunk in plan.entries:
+        if index not in plan.prepared:
+            results.append(_unbatched_result(plan, index, chunk))
+            continue
+        glossary_for_chunk, protected_text, restoration_map = plan.prepared[index]
+        translated = parts.get(index)
+        if _batch_part_incomplete(translated, restoration_map):
+            translated = await _atranslate_with_placeholder_retries(
+                client=client,
+                outline=outline,
+                glossary=glossary_for_chunk,
+                protected_chunk=protected_text,
+                expected_placeholders=list(restoration_map),
+                style_rules=style_rules,
+                prompt_outline_mode=prompt_outline_mode,
+            )
+        results.append(_finish_batch_part(plan, index, chunk, translated))
+    return results
+
+
+def _plan_chunk_batch(
+    entries: Sequence[Tuple[int, ChunkPlanEntry]],
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    *,
+    client: KimiClient,
+    style_rules: Optional[Sequence[str]],
+    prompt_outline_mode: str,
+    glossary_mode: str,
+) -> _BatchPlan:
+    """Prepare one batch; ``messages`` is None unless two chunks need the model.
+
+    Chunks left without a batched reply are translated one by one from the
+    glossary selection, cache key and protected text prepared here.
+    """
+    selected: Dict[int, Sequence[Dict[str, object]]] = {}
+    cache_keys: Dict[int, Optional[bytes]] = {}
+    cached: Dict[int, ChunkTranslation] = {}
+    pending: List[Tuple[int, ChunkPlanEntry]] = []
+    for index, chunk in entries:
+        if not chunk.source_text:
+            continue
+        selected[index] = _select_chunk_glossary(
+            chunk.source_text, glossary, glossary_mode
+        )
+        cache_keys[index] = _translation_cache_key(
+            chunk.source_text,
+            outline,
+            selected[index],
+            client=client,
+            style_rules=style_rules,
+            prompt_outline_mode=prompt_outline_mode,
+        )
+        hit = _cached_translation(
+            cache_keys[index], chunk_id=chunk.chunk_id, index=index
+        )
+        if hit is None:
+            pending.append((index, chunk))
+        else:
+            cached[index] = hit
+
+    prepared = {
+        index: (selected[index],) + protect(chunk.source_text)
+        for index, chunk in pending
+    }
+    if len(pending) <= 1:
+        return _BatchPlan(
+            entries=entries,
+            cached=cached,
+            cache_keys=cache_keys,
+            prepared=prepared,
+            messages=None,
+        )
+    batch_items: List[Dict[str, object]] = []
+    batch_entries: List[_GlossaryEntry] = []
+    seen_entries: Set[_GlossaryEntry] = set()
+    for glossary_for_chunk, _, _ in prepared.values():
+        chunk_entries = _glossary_entries(glossary_for_chunk)
+        for item, entry in zip(glossary_for_chunk, chunk_entries):
+            if entry not in seen_entries:
+                seen_entries.add(entry)
+                batch_items.append(item)
+                batch_entries.append(entry)
+    batch_glossary = _GlossarySelection(
+        tuple(batch_items),
+        tuple(batch_entries),
+        glossary.literal_terms if isinstance(glossary, _GlossarySelection) else (),
+    )
+
+    messages = _build_step2_batch_messages(
+        outline,
+        batch_glossary,
+        [prepared[index][1] for index, _ in pending],
+        style_rules=style_rules,
+        placeholder_tokens=[list(prepared[index][2]) for index, _ in pending],
+        prompt_outline_mode=prompt_outline_mode,
+    )
+    return _BatchPlan(
+        entries=entries,
+        cached=cached,
+        cache_keys=cache_keys,
+        prepared=prepared,
+        messages=messages,
+    )
+
+
+def _batch_response_parts(plan: _BatchPlan, response: str) -> Dict[int, str]:
+    parts = _split_batch_response(response, len(plan.prepared))
+    if parts is None:
+        return {}
+    return dict(zip(plan.prepared, parts))
+
+
+def _batch_part_incomplete(
+    translated: Optional[str], restoration_map: Dict[str, str]
+) -> bool:
+    return (
+        translated is None
+        or _count_missing_placeholders(translated, restoration_map.keys()) > 0
+    )
+
+
+def _unbatched_result(
+    plan: _BatchPlan, index: int, chunk: ChunkPlanEntry
+) -> ChunkTranslation:
+    cached = plan.cached.get(index)
+    if cached is not None:
+        return cached
+    return ChunkTranslation(chunk_id=chunk.chunk_id, index=index, text="", warnings=())
+
+
+def _finish_batch_part(
+    plan: _BatchPlan, index: int, chunk: ChunkPlanEntry, translated: str
+) -> ChunkTranslation:
+    glossary_for_chunk, _, restoration_map = plan.prepared[index]
+    result = _finalize_chunk(
+        chunk.source_text,
+        translated,
+        restoration_map,
+        glossary_for_chunk,
+        chunk_id=chunk.chunk_id,
+        index=index,
+    )
+    _store_translation(plan.cache_keys[index], result)
+    return result
+
+
+def _split_batch_response(response: str, expected_parts: int) -> Optional[List[str]]:
+    parts = _BATCH_SEPARATOR_RE.split(response)
+    if len(parts) > 1 and not parts[-1].strip():
+        _ = parts.pop()
+    if len(parts) != expected_parts:
+        return _split_batch_response_on_headers(response, expected_parts)
+    return [_BATCH_HEADER_RE.sub("", part).strip("\n") for part in parts]
+
+
+def _split_batch_response_on_headers(
+    response: str, expected_parts: int
+) -> Optional[List[str]]:
+    # Models sometimes echo the === CHUNK n === headers instead of writing the
+    # separators; a complete, in-order set of headers delimits the parts too.
+    headers = list(_BATCH_HEADER_LINE_RE.finditer(response))
+    if [int(match.group(1)) for match in headers] != list(range(expected_parts)):
+        return None
+    if response[: headers[0].start()].strip():
+        return None
+    ends = [match.start() for match in headers[1:]] + [len(response)]
+    return [
+        _BATCH_SEPARATOR_RE.sub("", response[match.end() : end]).strip("\n")
+        for match, end in zip(headers, ends)
+    ]
+
+
+async def atranslate_chunks(
+    chunks: Sequence[ChunkPlanEntry],
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    *,
+    client: Optional[KimiClient] = None,
+    concurrency: int = 3,
+    max_concurrency: Optional[int] = None,
     style_rules: Optional[Sequence[str]] = None,
     prompt_outline_mode: str = "headings",
     glossary_mode: str = "filtered",
+    batch_max_chars: int = _BATCH_MAX_CHARS,
 ) -> List[ChunkTranslation]:
+    """Translate chunks on the running event loop instead of worker threads.
+
+    Mirrors ``translate_chunks``: the same batching, caching, ordering and
+    rate-limit window, with requests awaited instead of run on threads.
+    """
     if concurrency <= 0:
         raise ValueError("concurrency must be positive")
+    if max_concurrency is None:
+        max_concurrency = concurrency
+    if max_concurrency < concurrency:
+        raise ValueError("max_concurrency must be at least concurrency")
     if not chunks:
         return []
 
-    results: List[Optional[ChunkTranslation]] = [None] * len(chunks)
-    futures: Dict[Future[ChunkTranslation], int] = {}
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        for index, chunk in enumerate(chunks):
-            future = executor.submit(
-                translate_chunk,
-                chunk.source_text,
+    outline = _validate_outline(outline, prompt_outline_mode)
+    glossary = _build_glossary_index(glossary)
+    llm_client = client or KimiClient()
+    window = _ConcurrencyWindow(concurrency, max_concurrency)
+    pending = deque(_plan_batches(chunks, batch_max_chars))
+    in_flight: Dict["asyncio.Task[List[ChunkTranslation]]", List[int]] = {}
+    ready: Dict[int, ChunkTranslation] = {}
+
+    def submit(batch: List[int]) -> None:
+        task = asyncio.create_task(
+            _atranslate_chunk_batch(
+                [(index, chunks[index]) for index in batch],
                 outline,
                 glossary,
-                client=client,
-                chunk_id=chunk.chunk_id,
-                index=index,
+                client=llm_client,
                 style_rules=style_rules,
                 prompt_outline_mode=prompt_outline_mode,
                 glossary_mode=glossary_mode,
             )
-            futures[future] = index
-
-        try:
-            for future in as_completed(futures):
-                index = futures[future]
-                results[index] = future.result()
-        except Exception:
-            for future in futures:
-                _ = future.cancel()
-            raise
+        )
+        in_flight[task] = batch
 
-    translated: List[ChunkTranslation] = []
-    for item in results:
-        if item is None:
-            raise Step2TranslateError("missing chunk translation result")
-        translated.append(item)
-    return translated
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < window.size:
+                submit(pending.popleft())
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                batch = in_flight.pop(task)
+                try:
+                    translated = task.result()
+                except RateLimitError as exc:
+                    if window.size == 1:
+                        raise _batch_error(chunks, batch, exc) from exc
+                    pending.appendleft(batch)
+                    await asyncio.sleep(window.shrink())
+                    continue
+                except Exception as exc:
+                    raise _batch_error(chunks, batch, exc) from exc
+                window.grow()
+                for index, item in zip(batch, translated):
+                    ready[index] = item
+    finally:
+        # Stop the other requests before an error propagates.
+        for task in in_flight:
+            _ = task.cancel()
+        _ = await asyncio.gather(*in_flight, return_exceptions=True)
+
+    if len(ready) != len(chunks):
+        raise Step2TranslateError("missing chunk translation result")
+    return [ready[index] for index in range(len(chunks))]
+
+
+def _batch_error(
+    chunks: Sequence[ChunkPlanEntry], batch: Sequence[int], exc: Exception
+) -> Step2TranslateError:
+    chunk_ids = ", ".join(chunks[index].chunk_id for index in batch)
+    error_type = (
+        Step2RateLimitError if isinstance(exc, RateLimitError) else Step2TranslateError
+    )
+    return error_type(f"translation failed for chunk {chunk_ids}: {exc}")
 
 
 def _translate_with_placeholder_retries(
@@ -408,18 +1340,52 @@ def _translate_with_placeholder_retries(
     best_missing = len(expected_set)
     max_attempts = 3
 
-    for attempt in range(max_attempts):
-        if attempt > 0:
-            messages = _build_step2_messages(
-                outline,
-                glossary,
-                protected_chunk,
-                style_rules=style_rules,
-                placeholder_tokens=expected_placeholders,
-                prompt_outline_mode=prompt_outline_mode,
-            )
+    # Retries resend the same prompt; sampling alone gives another draw.
+    for _ in range(max_attempts):
         result = client.chat_completion(messages, json_mode=False)
-        missing = sum(1 for p in expected_set if p not in result)
+        missing = _count_missing_placeholders(result, expected_set)
+        if missing == 0:
+            return result
+        if missing < best_missing:
+            best_missing = missing
+            best_result = result
+
+    if best_result is not None:
+        return best_result
+    raise Step2TranslateError("translation failed after placeholder validation retries")
+
+
+async def _atranslate_with_placeholder_retries(
+    *,
+    client: KimiClient,
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    protected_chunk: str,
+    expected_placeholders: Sequence[str],
+    style_rules: Optional[Sequence[str]],
+    prompt_outline_mode: str = "headings",
+) -> str:
+    messages = _build_step2_messages(
+        outline,
+        glossary,
+        protected_chunk,
+        style_rules=style_rules,
+        placeholder_tokens=expected_placeholders if expected_placeholders else None,
+        prompt_outline_mode=prompt_outline_mode,
+    )
+
+    if not expected_placeholders:
+        return await client.achat_completion(messages, json_mode=False)
+
+    expected_set = set(expected_placeholders)
+    best_result: Optional[str] = None
+    best_missing = len(expected_set)
+    max_attempts = 3
+
+    # Retries resend the same prompt; sampling alone gives another draw.
+    for _ in range(max_attempts):
+        result = await client.achat_completion(messages, json_mode=False)
+        missing = _count_missing_placeholders(result, expected_set)
         if missing == 0:
             return result
         if missing < best_missing:
@@ -431,6 +1397,13 @@ def _translate_with_placeholder_retries(
     raise Step2TranslateError("translation failed after placeholder validation retries")
 
 
+def _count_missing_placeholders(result: str, expected: AbstractSet[str]) -> int:
+    # One regex pass collects the tokens present; only the leftovers get a
+    # substring check, which also covers tokens glued inside a longer match.
+    found = {match.group(0) for match in _PLACEHOLDER_SCAN_RE.finditer(result)}
+    return sum(1 for token in expected - found if token not in result)
+
+
 def _build_step2_messages(
     outline: Sequence[Dict[str, object]],
     glossary: Sequence[Dict[str, object]],
@@ -440,132 +1413,254 @@ def _build_step2_messages(
     placeholder_tokens: Optional[Sequence[str]] = None,
     prompt_outline_mode: str = "full",
 ) -> List[ChatCompletionMessageParam]:
-    system_prompt = (
-        "You are a technical translation assistant for study notes. "
-        "Output ONLY Markdown. Do not wrap output in JSON or code fences. "
-        "Preserve all placeholders and Markdown structure exactly."
-    )
-
-    outline_block = _render_condensed_outline(outline, mode=prompt_outline_mode)
-    glossary_block = _render_glossary(glossary)
-    rules_block = _render_style_rules(style_rules)
-
-    user_lines = [
-        "Translate the chunk from English to Chinese.",
-        "Requirements:",
-        "- Output Markdown only; no JSON wrapper, no extra commentary.",
-        "- Preserve Markdown structure, links, math, code fences, and inline code.",
-        "- NEVER convert inline code (`backticks`) into fenced code blocks (```). Keep `code` as `code`.",
-        "- Do not translate or modify placeholder tokens like __CODE_BLOCK_001__.",
-        "- Term style: 首次出现使用 `中文（English）`，后续只用中文。",
-        "- Annotation density: medium (key explanation + 1 example/analogy).",
-        "- Annotation format: `> **学习批注：** ...` or `> **背景扩展：** ...`.",
-        "- Glossary enforcement is soft: prefer glossary terms when relevant.",
-    ]
+    preamble = _render_step2_preamble(
+        outline,
+        task="Translate the chunk from English to Chinese.",
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+    )
+    context = _step2_chunk_context(glossary, placeholder_tokens)
+    return _step2_messages(
+        preamble,
+        f"{context}\n\n"
+        "Chunk (protected text, keep placeholders unchanged):\n"
+        f"<<<\n{protected_chunk}\n>>>",
+    )
 
-    if rules_block:
-        user_lines.extend(["", "Style rules:", rules_block])
-
-    if placeholder_tokens:
-        user_lines.extend(
-            [
-                "",
-                "Placeholders (must appear exactly once, unchanged):",
-            ]
+
+def _build_step2_batch_messages(
+    outline: Sequence[Dict[str, object]],
+    glossary: Sequence[Dict[str, object]],
+    protected_chunks: Sequence[str],
+    *,
+    style_rules: Optional[Sequence[str]] = None,
+    placeholder_tokens: Optional[Sequence[Sequence[str]]] = None,
+    prompt_outline_mode: str = "full",
+) -> List[ChatCompletionMessageParam]:
+    # Every chunk numbers its placeholders from 1, so each chunk lists its own
+    # tokens under its header rather than sharing one document-wide list.
+    preamble = _render_step2_preamble(
+        outline,
+        task=(
+            "Translate each numbered chunk independently from English to Chinese."
+        ),
+        extra_requirements=(
+            "- Separate the translated chunks with a line containing exactly "
+            f"'{_BATCH_SEPARATOR}'.",
+            "- Preserve chunk ordering; do not output the === CHUNK n === headers.",
+        ),
+        style_rules=style_rules,
+        prompt_outline_mode=prompt_outline_mode,
+    )
+    context = _step2_chunk_context(glossary, None)
+    tokens_per_chunk = placeholder_tokens or [()] * len(protected_chunks)
+    chunk_blocks = "".join(
+        f"\n=== CHUNK {position} ===\n"
+        + _render_chunk_placeholders(tokens)
+        + f"<<<\n{protected_chunk}\n>>>"
+        for position, (protected_chunk, tokens) in enumerate(
+            zip(protected_chunks, tokens_per_chunk)
         )
-        user_lines.extend(f"- {token}" for token in placeholder_tokens)
+    )
+    return _step2_messages(
+        preamble,
+        f"{context}\n\n"
+        f"Chunks (protected text, keep placeholders unchanged):{chunk_blocks}",
+    )
 
-    user_lines.extend(
-        [
-            "",
-            "Condensed outline:",
-            outline_block,
-            "",
-            "Glossary:",
-            glossary_block,
-            "",
-            "Chunk (protected text, keep placeholders unchanged):",
-            "<<<",
-            protected_chunk,
-            ">>>",
-        ]
+
+def _render_step2_preamble(
+    outline: Sequence[Dict[str, object]],
+    *,
+    task: str,
+    extra_requirements: Tuple[str, ...] = (),
+    style_rules: Optional[Sequence[str]] = None,
+    prompt_outline_mode: str = "full",
+) -> str:
+    # Everything here is shared by every chunk of a document; the per-chunk
+    # glossary, placeholders and text follow it in the user prompt.
+    return _render_step2_preamble_cached(
+        task,
+        extra_requirements,
+        _render_style_rules(style_rules),
+        _render_condensed_outline(outline, mode=prompt_outline_mode),
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _render_step2_preamble_cached(
+    task: str,
+    extra_requirements: Tuple[str, ...],
+    rules_block: str,
+    outline_block: str,
+) -> str:
+    lines = [task, *_STEP2_REQUIREMENT_LINES, *extra_requirements]
+    if rules_block:
+        lines.extend(["", "Style rules:", rules_block])
+    lines.extend(["", "Condensed outline:", outline_block])
+    return "\n".join(lines)
+
+
+def _step2_chunk_context(
+    glossary: Sequence[Dict[str, object]],
+    placeholder_tokens: Optional[Sequence[str]],
+) -> str:
+    # The preamble, glossary table and rules are rendered once per document
+    # by their caches; only this per-chunk tail is assembled on every call.
+    context = "Glossary:\n" + _render_glossary(glossary)
+    if not placeholder_tokens:
+        return context
+    return (
+        f"{context}\n\nPlaceholders (must appear exactly once, unchanged):\n- "
+        + "\n- ".join(placeholder_tokens)
+    )
+
+
+def _render_chunk_placeholders(tokens: Sequence[str]) -> str:
+    if not tokens:
+        return ""
+    return (
+        "Placeholders (must appear exactly once in this chunk, unchanged):\n- "
+        + "\n- ".join(tokens)
+        + "\n"
     )
 
-    user_prompt = "\n".join(user_lines)
+
+def _step2_messages(
+    preamble: str, chunk_prompt: str
+) -> List[ChatCompletionMessageParam]:
+    # The system prompt and preamble form a message prefix that is identical
+    # for every chunk of a document, so provider-side prompt caching can reuse
+    # it; the filtered glossary, placeholders and text follow in a second turn.
+    # Fresh dicts per call: clients or middleware may mutate the messages.
     return [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt},
+        {"role": "system", "content": _STEP2_SYSTEM_PROMPT},
+        {"role": "user", "content": preamble},
+        {"role": "user", "content": chunk_prompt},
     ]
 
 
 def _render_condensed_outline(
     outline: Sequence[Dict[str, object]], mode: str = "full"
 ) -> str:
-    if not outline:
+    # The outline is identical for every chunk of a document: a validated
+    # outline carries its rendered block, and raw outlines are rendered from
+    # a hashable copy of the fields they use through the lru cache.
+    if isinstance(outline, _ValidatedOutline) and outline.mode == mode:
+        return outline.block
+    return _render_outline_entries(_outline_key(outline, mode))
+
+
+def _render_outline_entries(entries: Tuple[_OutlineEntry, ...]) -> str:
+    if not entries:
         return "_No outline provided._"
-    lines: List[str] = []
+    return _render_condensed_outline_cached(entries)
+
+
+def _validate_outline(
+    outline: Sequence[Dict[str, object]], mode: str
+) -> _ValidatedOutline:
+    if isinstance(outline, _ValidatedOutline) and outline.mode == mode:
+        return outline
+    entries = _outline_key(outline, mode)
+    return _ValidatedOutline(
+        items=tuple(outline),
+        mode=mode,
+        entries=entries,
+        block=_render_outline_entries(entries),
+    )
+
+
+def _outline_key(
+    outline: Sequence[Dict[str, object]], mode: str
+) -> Tuple[_OutlineEntry, ...]:
+    entries: List[_OutlineEntry] = []
     for index, entry in enumerate(outline):
         item = _require_dict(entry, f"outline[{index}]")
         level = _require_int(item.get("level"), f"outline[{index}].level")
         heading = _require_str(item.get("heading"), f"outline[{index}].heading")
-
         if mode == "headings":
             # Headings-only mode: no summary_bullets or key_takeaways
-            line = f"- L{level} {heading}"
-            lines.append(line)
-        else:
-            # Full mode (legacy): include summary_bullets and key_takeaways
-            summary_bullets = _require_str_list(
-                item.get("summary_bullets"), f"outline[{index}].summary_bullets"
-            )
-            key_takeaways = _require_str_list(
-                item.get("key_takeaways"), f"outline[{index}].key_takeaways"
-            )
+            entries.append(_OutlineEntry(level, heading, (), ()))
+            continue
+        # Full mode (legacy): include summary_bullets and key_takeaways
+        summary_bullets = _require_str_list(
+            item.get("summary_bullets"), f"outline[{index}].summary_bullets"
+        )
+        key_takeaways = _require_str_list(
+            item.get("key_takeaways"), f"outline[{index}].key_takeaways"
+        )
+        entries.append(
+            _OutlineEntry(level, heading, tuple(summary_bullets), tuple(key_takeaways))
+        )
+    return tuple(entries)
 
-            details: List[str] = []
-            if summary_bullets:
-                details.append("Summary: " + "; ".join(summary_bullets))
-            if key_takeaways:
-                details.append("Takeaways: " + "; ".join(key_takeaways))
 
-            line = f"- L{level} {heading}"
-            if details:
-                line += " | " + " | ".join(details)
-            lines.append(line)
-    return "\n".join(lines)
+@functools.lru_cache(maxsize=4)
+def _render_condensed_outline_cached(entries: Tuple[_OutlineEntry, ...]) -> str:
+    return "\n".join([_format_outline_line(entry) for entry in entries])
+
+
+def _format_outline_line(entry: _OutlineEntry) -> str:
+    line = f"- L{entry.level} {entry.heading}"
+    if entry.summary_bullets:
+        line += " | Summary: " + "; ".join(entry.summary_bullets)
+    if entry.key_takeaways:
+        line += " | Takeaways: " + "; ".join(entry.key_takeaways)
+    return line
 
 
 def _render_glossary(glossary: Sequence[Dict[str, object]]) -> str:
     if not glossary:
         return "_No glossary entries._"
-    lines = [
-        "| term_en | term_zh | note_zh | keep_en_on_first_use |",
-        "| --- | --- | --- | --- |",
-    ]
-    for index, entry in enumerate(glossary):
-        item = _require_dict(entry, f"glossary[{index}]")
-        term_en = _require_str(item.get("term_en"), f"glossary[{index}].term_en")
-        term_zh = _require_str(item.get("term_zh"), f"glossary[{index}].term_zh")
-        note_zh = _require_str(item.get("note_zh"), f"glossary[{index}].note_zh")
-        keep_en = _require_bool(
-            item.get("keep_en_on_first_use"),
-            f"glossary[{index}].keep_en_on_first_use",
-        )
-        keep_value = "true" if keep_en else "false"
-        lines.append(
-            "| {term_en} | {term_zh} | {note_zh} | {keep_en} |".format(
-                term_en=_escape_table_cell(term_en),
-                term_zh=_escape_table_cell(term_zh),
-                note_zh=_escape_table_cell(note_zh),
-                keep_en=keep_value,
-            )
-        )
-    return "\n".join(lines)
+    return _render_glossary_cached(_glossary_entries(glossary))
+
+
+def _glossary_entries(
+    glossary: Sequence[Dict[str, object]],
+) -> Tuple[_GlossaryEntry, ...]:
+    if isinstance(glossary, _GlossarySelection):
+        return glossary.entries
+    return tuple(
+        _parse_glossary_entry(entry, index)[1] for index, entry in enumerate(glossary)
+    )
+
+
+def _parse_glossary_entry(
+    entry: object, index: int
+) -> Tuple[Dict[str, object], _GlossaryEntry]:
+    item = _require_dict(entry, f"glossary[{index}]")
+    term_en = _require_str(item.get("term_en"), f"glossary[{index}].term_en")
+    term_zh = _require_str(item.get("term_zh"), f"glossary[{index}].term_zh")
+    note_zh = _require_str(item.get("note_zh"), f"glossary[{index}].note_zh")
+    keep_en = _require_bool(
+        item.get("keep_en_on_first_use"),
+        f"glossary[{index}].keep_en_on_first_use",
+    )
+    return item, _GlossaryEntry(term_en, term_zh, note_zh, keep_en)
+
+
+@functools.lru_cache(maxsize=32)
+def _render_glossary_cached(entries: Tuple[_GlossaryEntry, ...]) -> str:
+    return "\n".join([*_GLOSSARY_TABLE_HEADER, *map(_format_glossary_row, entries)])
+
+
+def _format_glossary_row(entry: _GlossaryEntry) -> str:
+    return (
+        f"| {_escape_table_cell(entry.term_en)} | {_escape_table_cell(entry.term_zh)}"
+        f" | {_escape_table_cell(entry.note_zh)}"
+        f" | {'true' if entry.keep_en_on_first_use else 'false'} |"
+    )
 
 
 def _render_style_rules(style_rules: Optional[Sequence[str]]) -> str:
     if not style_rules:
         return ""
+    return _render_style_rules_cached(tuple(style_rules))
+
+
+@functools.lru_cache(maxsize=4)
+def _render_style_rules_cached(style_rules: Tuple[str, ...]) -> str:
     rules = [rule for rule in style_rules if rule]
     if not rules:
         return ""
@@ -573,20 +1668,16 @@ def _render_style_rules(style_rules: Optional[Sequence[str]]) -> str:
 
 
 def _validate_restored_chunk(*, original: str, restored: str) -> List[str]:
-    warnings: List[str] = []
-    try:
-        validate_fence_counts(original, restored)
-    except PreservationError as exc:
-        warnings.append(f"QA warning: {exc}")
-    try:
-        validate_math_delimiters(original, restored)
-    except PreservationError as exc:
-        warnings.append(f"QA warning: {exc}")
-    try:
-        validate_url_targets(original, restored)
-    except PreservationError as exc:
-        warnings.append(f"QA warning: {exc}")
+    warnings = [
+        f"QA warning: {message}"
+        for message in compare_preservation_counts(
+            collect_preservation_counts(original),
+            collect_preservation_counts(restored),
+        )
+    ]
 
+    if "__" not in restored:
+        return warnings
     placeholder_match = _PLACEHOLDER_RE.search(restored)
     if placeholder_match:
         warnings.append(
@@ -598,18 +1689,40 @@ def _validate_restored_chunk(*, original: str, restored: str) -> List[str]:
 def _collect_glossary_warnings(
     restored: str, glossary: Sequence[Dict[str, object]]
 ) -> List[str]:
+    found: Optional[Set[str]] = None
+    if (
+        ahocorasick is not None
+        and isinstance(glossary, _GlossarySelection)
+        and glossary.literal_terms
+        and len(glossary) >= _GLOSSARY_AUTOMATON_MIN_ENTRIES
+    ):
+        # One pass of the document-wide automaton finds every English and
+        # Chinese form instead of two substring searches per entry.
+        found = _find_literal_terms(glossary.literal_terms, restored)
+
     warnings: List[str] = []
-    for index, entry in enumerate(glossary):
-        item = _require_dict(entry, f"glossary[{index}]")
-        term_en = _require_str(item.get("term_en"), f"glossary[{index}].term_en")
-        term_zh = _require_str(item.get("term_zh"), f"glossary[{index}].term_zh")
-        if term_en in restored and term_zh not in restored:
+    for entry in _glossary_entries(glossary):
+        term_en, term_zh = entry.term_en, entry.term_zh
+        if found is None:
+            en_hit, zh_hit = term_en in restored, term_zh in restored
+        else:
+            # The automaton skips empty terms, which "in" always matches.
+            en_hit = not term_en or term_en in found
+            zh_hit = not term_zh or term_zh in found
+        if en_hit and not zh_hit:
             warnings.append(
                 f"glossary term '{term_en}' missing Chinese form '{term_zh}'"
             )
     return warnings
 
 
+def _find_literal_terms(terms: Tuple[str, ...], text: str) -> Set[str]:
+    if not terms:
+        return set()
+    automaton = _build_glossary_automaton(terms)
+    return {term for _, term in automaton.iter(text)}
+
+
 def _require_dict(value: object, label: str) -> Dict[str, object]:
     return require_dict(value, label, Step2TranslateError, expected="a dict")
 
@@ -636,5 +1749,7 @@ def _require_str_list(value: object, label: str) -> List[str]:
 
 
 def _escape_table_cell(value: str) -> str:
+    if "|" not in value and "\n" not in value:
+        return value
     escaped = value.replace("|", "\\|")
     return escaped.replace("\n", "<br>")
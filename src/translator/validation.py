@@ -57,7 +57,7 @@ def require_str_list(
     if allow_none and value is None:
         return []
     if allow_str and isinstance(value, str):
-        return [value] if value.strip() else []
+        return [value] if value and not value.isspace() else []
     if not isinstance(value, list):
         raise error_type(f"{label} must be {expected}")
     items = cast(List[object], value)
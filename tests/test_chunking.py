@@ -1,11 +1,8 @@
 """Tests for chunking layer."""
 
-import sys
 import pytest
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
 from translator.chunking import (
     build_chunk_plan,
     reconstruct_from_chunks,
@@ -1,13 +1,10 @@
 """Integration tests for end-to-end translation pipeline."""
 
-import sys
 import os
 import pytest
 from pathlib import Path
 from unittest.mock import Mock
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
 from translator.pipeline import translate_document
 
 
@@ -0,0 +1,233 @@
+"""Tests for the Jina Reader fetcher with a stub HTTP session."""
+
+import asyncio
+import json
+
+import pytest
+import requests
+
+import translator.jina_reader_fetcher as jina_reader_fetcher
+from translator.jina_reader_fetcher import (
+    JinaReaderConfig,
+    JinaReaderError,
+    JinaReaderTransientError,
+    clear_fetch_cache,
+    fetch_markdown,
+    fetch_markdown_async,
+)
+
+
+CONTENT = "Reader markdown. " * 20
+OK_BODY = json.dumps({"code": 200, "data": {"content": CONTENT}}).encode("utf-8")
+NO_WAIT = JinaReaderConfig(backoff_initial=0, backoff_max=0)
+
+
+class StubResponse:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+
+class StubSession:
+    """Stub requests.Session that replays queued responses or exceptions."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url))
+        return self._next()
+
+    def post(self, url, **kwargs):
+        self.calls.append(("POST", url, kwargs["data"]))
+        return self._next()
+
+    def _next(self):
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply
+
+
+@pytest.fixture(autouse=True)
+def isolate_fetcher(monkeypatch):
+    """Keep cached fetches and retry sleeps from leaking between tests."""
+    clear_fetch_cache()
+    monkeypatch.setattr(jina_reader_fetcher.time, "sleep", lambda seconds: None)
+    yield
+    clear_fetch_cache()
+
+
+@pytest.fixture
+def fetch_cache(monkeypatch):
+    """Opt in to the fetch cache, which is off by default."""
+    monkeypatch.setattr(jina_reader_fetcher, "_FETCH_CACHE_SIZE", 256)
+
+
+def _use_session(monkeypatch, *replies):
+    session = StubSession(*replies)
+    monkeypatch.setattr(jina_reader_fetcher, "_get_session", lambda: session)
+    return session
+
+
+def test_fetch_markdown_retries_transient_failures(monkeypatch):
+    """429/5xx replies and requests errors are retried until one succeeds."""
+    session = _use_session(
+        monkeypatch,
+        StubResponse(503),
+        requests.ConnectionError("reset"),
+        StubResponse(429),
+        StubResponse(200, OK_BODY),
+    )
+
+    assert fetch_markdown("https://example.com/a", NO_WAIT) == CONTENT
+    assert session.calls == [("GET", "https://r.jina.ai/https://example.com/a")] * 4
+
+
+def test_fetch_markdown_stops_after_max_attempts(monkeypatch):
+    """The last transient error is re-raised once max_attempts is spent."""
+    session = _use_session(monkeypatch, *[StubResponse(502)] * 5)
+    config = JinaReaderConfig(max_attempts=3, backoff_initial=0, backoff_max=0)
+
+    with pytest.raises(JinaReaderTransientError, match="502"):
+        fetch_markdown("https://example.com/a", config)
+    assert len(session.calls) == 3
+
+
+def test_fetch_markdown_does_not_retry_permanent_errors(monkeypatch):
+    """Non-transient Reader errors fail on the first attempt."""
+    session = _use_session(monkeypatch, StubResponse(404), StubResponse(200, OK_BODY))
+
+    with pytest.raises(JinaReaderError, match="HTTP 404"):
+        fetch_markdown("https://example.com/a", NO_WAIT)
+    assert len(session.calls) == 1
+
+
+def test_fetch_markdown_backoff_is_capped(monkeypatch):
+    """Sleeps grow exponentially with jitter but never exceed backoff_max."""
+    sleeps = []
+    monkeypatch.setattr(jina_reader_fetcher.time, "sleep", sleeps.append)
+    monkeypatch.setattr(jina_reader_fetcher.random, "uniform", lambda low, high: high)
+    _use_session(monkeypatch, *[StubResponse(500)] * 4)
+    config = JinaReaderConfig(max_attempts=4, backoff_initial=1, backoff_max=3)
+
+    with pytest.raises(JinaReaderTransientError):
+        fetch_markdown("https://example.com/a", config)
+    assert sleeps == [2, 3, 3]
+
+
+def test_reader_headers_keep_the_session_accept_encoding():
+    """requests advertises the encodings urllib3 can decode; we do not override it."""
+    request = requests.Session().prepare_request(
+        requests.Request(
+            "GET",
+            "https://r.jina.ai/https://example.com/a",
+            headers=jina_reader_fetcher._build_headers(),
+        )
+    )
+
+    assert request.headers["Accept-Encoding"] == (
+        requests.utils.default_headers()["Accept-Encoding"]
+    )
+    assert request.headers["X-Return-Format"] == "markdown"
+
+
+def test_fetch_markdown_serves_repeats_from_cache(monkeypatch, fetch_cache):
+    """A repeated URL and config is answered without another request."""
+    session = _use_session(
+        monkeypatch, StubResponse(200, OK_BODY), StubResponse(200, OK_BODY)
+    )
+
+    assert fetch_markdown("https://example.com/a", NO_WAIT) == CONTENT
+    assert fetch_markdown(" https://example.com/a ", NO_WAIT) == CONTENT
+    assert len(session.calls) == 1
+
+    clear_fetch_cache()
+    assert fetch_markdown("https://example.com/a", NO_WAIT) == CONTENT
+    assert len(session.calls) == 2
+
+
+def test_fetch_cache_entries_expire(monkeypatch, fetch_cache):
+    """Entries older than the TTL are fetched again."""
+    now = [1000.0]
+    monkeypatch.setattr(jina_reader_fetcher.time, "monotonic", lambda: now[0])
+    session = _use_session(
+        monkeypatch, StubResponse(200, OK_BODY), StubResponse(200, OK_BODY)
+    )
+
+    fetch_markdown("https://example.com/a", NO_WAIT)
+    now[0] += jina_reader_fetcher._FETCH_CACHE_TTL_SECONDS
+    fetch_markdown("https://example.com/a", NO_WAIT)
+    assert len(session.calls) == 1
+    now[0] += 1
+    fetch_markdown("https://example.com/a", NO_WAIT)
+    assert len(session.calls) == 2
+
+
+def test_fetch_cache_is_off_by_default(monkeypatch):
+    """Without opting in, every fetch goes to the Reader."""
+    session = _use_session(
+        monkeypatch, StubResponse(200, OK_BODY), StubResponse(200, OK_BODY)
+    )
+
+    fetch_markdown("https://example.com/a", NO_WAIT)
+    fetch_markdown("https://example.com/a", NO_WAIT)
+    assert len(session.calls) == 2
+
+
+def test_failed_fetches_are_not_cached(monkeypatch, fetch_cache):
+    """A failed fetch is retried from scratch on the next call."""
+    session = _use_session(monkeypatch, StubResponse(404), StubResponse(200, OK_BODY))
+
+    with pytest.raises(JinaReaderError):
+        fetch_markdown("https://example.com/a", NO_WAIT)
+    assert fetch_markdown("https://example.com/a", NO_WAIT) == CONTENT
+    assert len(session.calls) == 2
+
+
+def test_fetch_markdown_async_falls_back_to_executor(monkeypatch):
+    """Without httpx the blocking fetch runs in the loop's executor."""
+    monkeypatch.setattr(jina_reader_fetcher, "httpx", None)
+    session = _use_session(monkeypatch, StubResponse(503), StubResponse(200, OK_BODY))
+
+    markdown = asyncio.run(fetch_markdown_async("https://example.com/a", NO_WAIT))
+
+    assert markdown == CONTENT
+    assert session.calls == [("GET", "https://r.jina.ai/https://example.com/a")] * 2
+
+
+def test_fetch_markdown_async_uses_httpx_client(monkeypatch):
+    """The httpx path retries, POSTs fragment URLs, and keeps httpx's encodings."""
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.setattr(jina_reader_fetcher, "httpx", httpx)
+    monkeypatch.setattr(jina_reader_fetcher.asyncio, "sleep", _no_sleep)
+    requests_seen = []
+    replies = [httpx.Response(503), httpx.Response(200, content=OK_BODY)]
+
+    def handler(request):
+        requests_seen.append(request)
+        return replies.pop(0)
+
+    client_headers = {}
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            client_headers.update(client.headers)
+            return await fetch_markdown_async(
+                "https://example.com/a#intro", NO_WAIT, client=client
+            )
+
+    assert asyncio.run(fetch()) == CONTENT
+    assert [(r.method, str(r.url)) for r in requests_seen] == [
+        ("POST", "https://r.jina.ai/")
+    ] * 2
+    assert requests_seen[0].content == b"url=https%3A%2F%2Fexample.com%2Fa%23intro"
+    assert (
+        requests_seen[0].headers["Accept-Encoding"]
+        == client_headers["accept-encoding"]
+    )
+
+
+async def _no_sleep(seconds):
+    return None
@@ -0,0 +1,46 @@
+"""Tests for the Kimi client wrapper with a stub OpenAI transport."""
+
+import asyncio
+from types import SimpleNamespace
+
+import translator.llm_client as llm_client
+from translator.llm_client import KimiClient
+
+
+class LoopBoundAsyncOpenAI:
+    """Stub AsyncOpenAI whose connections only work on their first loop."""
+
+    instances = []
+
+    def __init__(self, api_key, base_url):
+        self.loop = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        LoopBoundAsyncOpenAI.instances.append(self)
+
+    async def _create(self, **kwargs):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            raise RuntimeError("Event loop is closed")
+        message = SimpleNamespace(content="ok")
+        choice = SimpleNamespace(finish_reason="stop", message=message)
+        return SimpleNamespace(choices=[choice])
+
+
+def test_achat_completion_survives_a_second_event_loop(monkeypatch):
+    """Each asyncio.run gets its own async client; one loop reuses it."""
+    monkeypatch.setenv("MOONSHOT_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "AsyncOpenAI", LoopBoundAsyncOpenAI)
+    LoopBoundAsyncOpenAI.instances = []
+    client = KimiClient(max_retries=1)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def twice():
+        first = await client.achat_completion(messages)
+        second = await client.achat_completion(messages)
+        return [first, second]
+
+    assert asyncio.run(twice()) == ["ok", "ok"]
+    assert asyncio.run(twice()) == ["ok", "ok"]
+    assert len(LoopBoundAsyncOpenAI.instances) == 2
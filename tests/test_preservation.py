@@ -1,11 +1,8 @@
 """Tests for preservation layer (protect/restore)."""
 
-import sys
 import pytest
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
 from translator.preservation import (
     protect,
     restore,
@@ -13,15 +10,19 @@ from translator.preservation import (
     validate_fence_counts,
     validate_math_delimiters,
     validate_url_targets,
+    collect_preservation_counts,
+    compare_preservation_counts,
     PreservationError,
 )
 
 
-@pytest.fixture
+PROTECTION_FIXTURE_PATH = Path(__file__).parent / "fixtures" / "protection.md"
+
+
+@pytest.fixture(scope="session")
 def protection_fixture():
-    """Load the protection fixture file."""
-    fixture_path = Path(__file__).parent / "fixtures" / "protection.md"
-    return fixture_path.read_text(encoding="utf-8")
+    """Load the protection fixture file once; tests treat it as read-only."""
+    return PROTECTION_FIXTURE_PATH.read_text(encoding="utf-8")
 
 
 def test_protect_restore_roundtrip(protection_fixture):
@@ -41,20 +42,21 @@ def test_protect_restore_roundtrip(protection_fixture):
     assert restored == original, "Restored text must match original exactly"
 
 
-def test_protect_restore_roundtrip_simple():
-    """Test roundtrip with simple examples."""
-    test_cases = [
+@pytest.mark.parametrize(
+    "original",
+    [
         "Simple text with `inline code`",
         "Math: $E=mc^2$ and $$\\int x dx$$",
         "Link: [text](https://example.com)",
         "```python\ncode\n```",
         "HTML: <span>text</span>",
-    ]
-
-    for original in test_cases:
-        protected, restoration_map = protect(original)
-        restored = restore(protected, restoration_map)
-        assert restored == original, f"Failed for: {original}"
+    ],
+)
+def test_protect_restore_roundtrip_simple(original):
+    """Test roundtrip with simple examples."""
+    protected, restoration_map = protect(original)
+    restored = restore(protected, restoration_map)
+    assert restored == original
 
 
 def test_placeholder_mismatch_fails():
@@ -143,6 +145,23 @@ def test_url_target_validation():
         validate_url_targets(original, corrupted)
 
 
+def test_preservation_counts_report_each_mismatch():
+    """Test that the bundled counts report the same mismatches as validators."""
+    original = "```py\nx\n```\n$a$ \\(b\\) [link](https://example.com)"
+    corrupted = "```py\nx\n\n$a \\(b\\) [link](https://other.com)"
+
+    assert compare_preservation_counts(
+        collect_preservation_counts(original), collect_preservation_counts(original)
+    ) == []
+    assert compare_preservation_counts(
+        collect_preservation_counts(original), collect_preservation_counts(corrupted)
+    ) == [
+        "code fence count mismatch",
+        "math delimiter count mismatch",
+        "URL target mismatch",
+    ]
+
+
 def test_empty_text():
     """Test protection of empty text."""
     original = ""
@@ -191,8 +210,12 @@ def test_multiple_same_type():
     original = "`code1` and `code2` and `code3`"
     protected, restoration_map = protect(original)
 
-    # Should have 3 placeholders
-    assert len(restoration_map) == 3
+    # Should have 3 placeholders, listed in numbering order
+    assert list(restoration_map) == [
+        "__INLINE_CODE_001__",
+        "__INLINE_CODE_002__",
+        "__INLINE_CODE_003__",
+    ]
 
     restored = restore(protected, restoration_map)
     assert restored == original
@@ -228,3 +251,27 @@ def test_unclosed_backtick_before_code_fence():
     assert "__CODE_BLOCK_001__" in protected
     restored = restore(protected, restoration_map)
     assert restored == original
+
+
+def test_unclosed_inline_bracket_math_before_newline():
+    original = "Open \\( without a close\nnext line \\(x\\)\n"
+    protected, restoration_map = protect(original)
+    assert list(restoration_map.values()) == ["\\(x\\)"]
+    assert restore(protected, restoration_map) == original
+
+
+def test_nested_math_environments_roundtrip():
+    original = (
+        "Text\n\\begin{equation}\n\\begin{aligned}\nx &= 1\n\\end{aligned}\n"
+        "\\end{equation}\nmore"
+    )
+    protected, restoration_map = protect(original)
+    assert protected == "Text\n__MATH_BLOCK_001__\nmore"
+    assert restore(protected, restoration_map) == original
+
+
+def test_restore_adjacent_placeholders():
+    original = "$x$`y`[l](https://example.com)"
+    protected, restoration_map = protect(original)
+    assert "____" in protected
+    assert restore(protected, restoration_map) == original
@@ -0,0 +1,66 @@
+"""Tests for the Step 1 document profile with a stub LLM client."""
+
+import json
+
+from translator.step1_profile import profile
+
+
+class StubClient:
+    """Stub client that returns a fixed profile JSON payload."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def chat_completion(self, messages, json_mode=False):
+        return json.dumps(self.payload)
+
+
+def _glossary_entry(term_en, term_zh, note_zh="", keep_en=True):
+    return {
+        "term_en": term_en,
+        "term_zh": term_zh,
+        "note_zh": note_zh,
+        "keep_en_on_first_use": keep_en,
+    }
+
+
+def _profile(glossary):
+    return {
+        "doc": {
+            "title": "Doc",
+            "source": {"type": "file", "value": "doc.md"},
+            "language": {"source": "en", "target": "zh-CN"},
+        },
+        "outline": [],
+        "glossary": glossary,
+        "style_guide": {
+            "tone": "technical-but-friendly",
+            "annotation_density": "medium",
+            "rules": [],
+        },
+    }
+
+
+def test_profile_glossary_dedupes_terms_and_merges_notes():
+    """Repeated English terms keep the first entry and borrow a missing note."""
+    client = StubClient(
+        _profile(
+            [
+                _glossary_entry("Closure", "闭包", keep_en=False),
+                _glossary_entry("Mutex", "互斥锁", note_zh="锁"),
+                _glossary_entry(" closure ", "闭合", note_zh="函数与环境"),
+                _glossary_entry("mutex", "互斥量", note_zh="另一个注释"),
+            ]
+        )
+    )
+
+    payload, markdown = profile(
+        content="text", source_type="file", source_value="doc.md", client=client
+    )
+
+    assert payload["glossary"] == [
+        _glossary_entry("Closure", "闭包", note_zh="函数与环境"),
+        _glossary_entry("Mutex", "互斥锁", note_zh="锁"),
+    ]
+    assert "闭合" not in markdown
+    assert "互斥量" not in markdown
@@ -0,0 +1,517 @@
+"""Tests for Step 2 chunk translation with a stub LLM client."""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from openai import RateLimitError
+
+import translator.step2_translate as step2_translate
+from translator.chunking import build_chunk_plan
+from translator.preservation import restore
+from translator.step2_translate import (
+    _TRANSLATION_CACHE,
+    Step2RateLimitError,
+    Step2TranslateError,
+    _escape_table_cell,
+    _filter_glossary_for_chunk,
+    _split_batch_response,
+    _validate_restored_chunk,
+    atranslate_chunks,
+    iter_translate_chunks,
+    translate_chunks,
+)
+
+
+_CHUNK_BLOCK_RE = re.compile(
+    r"=== CHUNK \d+ ===\n(?:(?:- |Placeholders )[^\n]*\n)*<<<\n(.*?)\n>>>",
+    re.DOTALL,
+)
+_SINGLE_CHUNK_RE = re.compile(r"<<<\n(.*)\n>>>", re.DOTALL)
+
+
+@pytest.fixture(autouse=True)
+def clear_translation_cache():
+    """Keep cached translations from leaking between tests."""
+    _TRANSLATION_CACHE.clear()
+    yield
+    _TRANSLATION_CACHE.clear()
+
+
+class EchoClient:
+    """Stub client that echoes the protected chunk(s) back unchanged."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat_completion(self, messages, json_mode=False):
+        self.calls += 1
+        user_prompt = messages[-1]["content"]
+        blocks = _CHUNK_BLOCK_RE.findall(user_prompt)
+        if blocks:
+            return "\n%%%%%%\n".join(blocks)
+        return _SINGLE_CHUNK_RE.search(user_prompt).group(1)
+
+
+OUTLINE = [
+    {"level": 1, "heading": "Intro", "summary_bullets": [], "key_takeaways": []}
+]
+GLOSSARY = [
+    {
+        "term_en": "function",
+        "term_zh": "函数",
+        "note_zh": "",
+        "keep_en_on_first_use": True,
+    }
+]
+
+
+def _make_chunks():
+    text = "\n\n".join(
+        f"## Section {i}\n\nUse `call_{i}()` as a function, "
+        f"see [docs](https://example.com/{i})."
+        for i in range(6)
+    )
+    return build_chunk_plan(text, max_chunk_chars=80)
+
+
+def test_translate_chunks_roundtrip_with_echo_client():
+    """Echoed translations restore every protected span."""
+    chunks = _make_chunks()
+    client = EchoClient()
+    results = translate_chunks(chunks, OUTLINE, GLOSSARY, client=client, concurrency=2)
+
+    assert len(chunks) > 1
+    assert [r.chunk_id for r in results] == [c.chunk_id for c in chunks]
+    assert client.calls == len(chunks)
+    for result, chunk in zip(results, chunks):
+        assert result.text.strip() == chunk.source_text.strip()
+
+
+def test_translate_chunks_batched_uses_fewer_requests():
+    """Batched mode packs several chunks into one request."""
+    chunks = _make_chunks()
+    client = EchoClient()
+    results = translate_chunks(
+        chunks, OUTLINE, GLOSSARY, client=client, concurrency=1, batch_max_chars=10_000
+    )
+
+    assert client.calls == 1
+    for result, chunk in zip(results, chunks):
+        assert result.text.strip() == chunk.source_text.strip()
+
+
+class PromptRecordingClient(EchoClient):
+    """Echo client that keeps every user prompt it was sent."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def chat_completion(self, messages, json_mode=False):
+        self.prompts.append(messages[-1]["content"])
+        return super().chat_completion(messages, json_mode=json_mode)
+
+
+def test_batch_prompt_lists_placeholders_per_chunk():
+    """Chunks number placeholders from 1; no token is listed twice per block."""
+    chunks = _make_chunks()
+    client = PromptRecordingClient()
+    results = translate_chunks(
+        chunks, OUTLINE, GLOSSARY, client=client, concurrency=1, batch_max_chars=10_000
+    )
+
+    (prompt,) = client.prompts
+    context, *blocks = re.split(r"^=== CHUNK \d+ ===$", prompt, flags=re.MULTILINE)
+    assert "Placeholders" not in context
+    assert len(blocks) == len(chunks)
+    for block in blocks:
+        tokens = re.findall(r"^- (__\w+__)$", block, flags=re.MULTILINE)
+        assert tokens
+        assert len(tokens) == len(set(tokens))
+    assert all("__URL_001__" in block for block in blocks)
+    for result, chunk in zip(results, chunks):
+        assert result.text.strip() == chunk.source_text.strip()
+
+
+class AsyncEchoClient(EchoClient):
+    """Echo client exposing the async completion API."""
+
+    async def achat_completion(self, messages, json_mode=False):
+        await asyncio.sleep(0)
+        return self.chat_completion(messages, json_mode=json_mode)
+
+
+def test_atranslate_chunks_matches_sync_results():
+    """The asyncio path returns the same ordered results, batched or not."""
+    chunks = _make_chunks()
+    expected = translate_chunks(chunks, OUTLINE, GLOSSARY, client=EchoClient())
+    _TRANSLATION_CACHE.clear()
+
+    single = AsyncEchoClient()
+    results = asyncio.run(
+        atranslate_chunks(chunks, OUTLINE, GLOSSARY, client=single, concurrency=2)
+    )
+    assert single.calls == len(chunks)
+    assert [r.text for r in results] == [r.text for r in expected]
+    _TRANSLATION_CACHE.clear()
+
+    batched = AsyncEchoClient()
+    results = asyncio.run(
+        atranslate_chunks(
+            chunks, OUTLINE, GLOSSARY, client=batched, batch_max_chars=10_000
+        )
+    )
+    assert batched.calls == 1
+    assert [r.text.strip() for r in results] == [r.text.strip() for r in expected]
+
+
+class SlowFirstClient(EchoClient):
+    """Echo client that answers the first chunk last."""
+
+    def chat_completion(self, messages, json_mode=False):
+        if "Section 0" in messages[-1]["content"]:
+            time.sleep(0.05)
+        return super().chat_completion(messages, json_mode=json_mode)
+
+
+def test_iter_translate_chunks_yields_in_chunk_order():
+    """Chunks that finish early are held back until earlier ones arrive."""
+    chunks = _make_chunks()
+    results = list(
+        iter_translate_chunks(
+            chunks, OUTLINE, GLOSSARY, client=SlowFirstClient(), concurrency=3
+        )
+    )
+
+    assert [r.index for r in results] == list(range(len(chunks)))
+
+
+def test_interleaved_generators_survive_shared_pool_growth():
+    """A larger max_concurrency elsewhere must not stop a running generator."""
+    chunks = _make_chunks()
+    workers = step2_translate._EXECUTOR_WORKERS or (os.cpu_count() or 1) * 2
+    small = iter_translate_chunks(
+        chunks, OUTLINE, GLOSSARY, client=EchoClient(), concurrency=1
+    )
+    first = next(small)
+    large = iter_translate_chunks(
+        chunks,
+        OUTLINE,
+        GLOSSARY,
+        client=EchoClient(),
+        concurrency=1,
+        max_concurrency=workers + 1,
+    )
+    small_results = [first]
+    large_results = []
+    for from_small, from_large in zip(small, large):
+        small_results.append(from_small)
+        large_results.append(from_large)
+    large_results.extend(large)
+
+    assert [r.index for r in small_results] == list(range(len(chunks)))
+    assert [r.index for r in large_results] == list(range(len(chunks)))
+
+
+class RateLimitedOnceClient(EchoClient):
+    """Echo client whose first request is rejected with HTTP 429."""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+    def chat_completion(self, messages, json_mode=False):
+        with self.lock:
+            first = self.calls == 0
+            if first:
+                self.calls += 1
+        if first:
+            raise _rate_limit_error()
+        return super().chat_completion(messages, json_mode=json_mode)
+
+
+def _rate_limit_error():
+    response = SimpleNamespace(request=None, status_code=429, headers={})
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def test_translate_chunks_retries_rate_limited_batch(monkeypatch):
+    """A rate-limited batch is requeued after a backoff instead of failing."""
+    sleeps = []
+    monkeypatch.setattr(step2_translate.time, "sleep", sleeps.append)
+    chunks = _make_chunks()
+    client = RateLimitedOnceClient()
+    results = translate_chunks(chunks, OUTLINE, GLOSSARY, client=client, concurrency=2)
+
+    assert client.calls == len(chunks) + 1
+    assert sleeps == [step2_translate._RATE_LIMIT_BACKOFF_INITIAL]
+    assert [r.chunk_id for r in results] == [c.chunk_id for c in chunks]
+
+
+class AsyncRateLimitedOnceClient(RateLimitedOnceClient):
+    """Async variant of the once-throttled echo client."""
+
+    async def achat_completion(self, messages, json_mode=False):
+        return self.chat_completion(messages, json_mode=json_mode)
+
+
+def test_atranslate_chunks_retries_rate_limited_batch(monkeypatch):
+    """The asyncio path shrinks its window and backs off the same way."""
+    sleeps = []
+
+    async def record_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(step2_translate.asyncio, "sleep", record_sleep)
+    chunks = _make_chunks()
+    client = AsyncRateLimitedOnceClient()
+    results = asyncio.run(
+        atranslate_chunks(chunks, OUTLINE, GLOSSARY, client=client, concurrency=2)
+    )
+
+    assert client.calls == len(chunks) + 1
+    assert sleeps == [step2_translate._RATE_LIMIT_BACKOFF_INITIAL]
+    assert [r.chunk_id for r in results] == [c.chunk_id for c in chunks]
+
+
+class AlwaysRateLimitedClient(EchoClient):
+    """Client whose every request is rejected with HTTP 429."""
+
+    def chat_completion(self, messages, json_mode=False):
+        raise _rate_limit_error()
+
+    async def achat_completion(self, messages, json_mode=False):
+        raise _rate_limit_error()
+
+
+def test_rate_limit_at_window_of_one_names_the_chunk():
+    """Throttling at a window of one surfaces like any other batch failure."""
+    chunks = _make_chunks()
+
+    with pytest.raises(Step2RateLimitError, match=chunks[0].chunk_id) as excinfo:
+        translate_chunks(
+            chunks, OUTLINE, GLOSSARY, client=AlwaysRateLimitedClient(), concurrency=1
+        )
+    assert isinstance(excinfo.value.__cause__, RateLimitError)
+
+    with pytest.raises(Step2RateLimitError, match=chunks[0].chunk_id):
+        asyncio.run(
+            atranslate_chunks(
+                chunks,
+                OUTLINE,
+                GLOSSARY,
+                client=AlwaysRateLimitedClient(),
+                concurrency=1,
+            )
+        )
+
+
+class ThreadRecordingClient(EchoClient):
+    """Echo client that records which threads served its requests."""
+
+    def __init__(self):
+        super().__init__()
+        self.thread_names = set()
+
+    def chat_completion(self, messages, json_mode=False):
+        self.thread_names.add(threading.current_thread().name)
+        return super().chat_completion(messages, json_mode=json_mode)
+
+
+def test_translate_chunks_runs_on_caller_executor():
+    """A caller-supplied executor replaces the shared thread pool."""
+    chunks = _make_chunks()
+    client = ThreadRecordingClient()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="caller") as pool:
+        translate_chunks(chunks, OUTLINE, GLOSSARY, client=client, executor=pool)
+
+    assert client.thread_names
+    assert all(name.startswith("caller") for name in client.thread_names)
+
+
+class ModelEchoClient(EchoClient):
+    """Echo client that reports a model name, like KimiClient."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+
+def test_translation_cache_is_off_by_default():
+    """Without opting in, repeating a document asks the model again."""
+    chunks = _make_chunks()
+    client = EchoClient()
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=client)
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=client)
+
+    assert client.calls == 2 * len(chunks)
+    assert not _TRANSLATION_CACHE
+
+
+def test_translate_chunks_reuses_cached_translations(monkeypatch):
+    """Repeating a document serves every clean chunk from the cache."""
+    monkeypatch.setattr(step2_translate, "_TRANSLATION_CACHE_SIZE", 1024)
+    chunks = _make_chunks()
+    client = ModelEchoClient("model-a")
+    first = translate_chunks(chunks, OUTLINE, GLOSSARY, client=client)
+    second = translate_chunks(chunks, OUTLINE, GLOSSARY, client=client)
+
+    assert client.calls == len(chunks)
+    assert [r.text for r in second] == [r.text for r in first]
+    assert [r.chunk_id for r in second] == [c.chunk_id for c in chunks]
+
+
+def test_translation_cache_skips_clients_without_model(monkeypatch):
+    """Clients that do not report a model are never cached."""
+    monkeypatch.setattr(step2_translate, "_TRANSLATION_CACHE_SIZE", 1024)
+    chunks = _make_chunks()
+    client = EchoClient()
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=client)
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=client)
+
+    assert client.calls == 2 * len(chunks)
+    assert not _TRANSLATION_CACHE
+
+
+def test_translation_cache_is_keyed_by_model(monkeypatch):
+    """A client for a different model never gets another model's translations."""
+    monkeypatch.setattr(step2_translate, "_TRANSLATION_CACHE_SIZE", 1024)
+    chunks = _make_chunks()
+    first = ModelEchoClient("model-a")
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=first)
+
+    same_model = ModelEchoClient("model-a")
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=same_model)
+    other_model = ModelEchoClient("model-b")
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=other_model)
+
+    assert same_model.calls == 0
+    assert other_model.calls == len(chunks)
+
+
+class MutatingClient(EchoClient):
+    """Echo client that edits the messages it is handed, like middleware."""
+
+    def __init__(self):
+        super().__init__()
+        self.system_prompts = []
+
+    def chat_completion(self, messages, json_mode=False):
+        self.system_prompts.append(messages[0]["content"])
+        for message in messages[:-1]:
+            message["content"] += " [mutated]"
+        return super().chat_completion(messages, json_mode=json_mode)
+
+
+def test_translate_chunks_messages_are_fresh_per_request():
+    """Mutating one request's messages does not leak into later requests."""
+    chunks = _make_chunks()
+    client = MutatingClient()
+    translate_chunks(chunks, OUTLINE, GLOSSARY, client=client, concurrency=1)
+
+    assert len(client.system_prompts) == len(chunks)
+    assert not any("[mutated]" in prompt for prompt in client.system_prompts)
+
+
+def test_split_batch_response_rejects_wrong_part_count():
+    """A reply with the wrong number of parts is not split."""
+    assert _split_batch_response("a\n%%%%%%\nb", 2) == ["a", "b"]
+    assert _split_batch_response("a\n%%%%%%\nb\n%%%%%%\n", 2) == ["a", "b"]
+    assert _split_batch_response("a only", 2) is None
+
+
+def test_split_batch_response_falls_back_to_chunk_headers():
+    """Echoed chunk headers split a reply that lost its separators."""
+    reply = "=== CHUNK 0 ===\na\n\n=== CHUNK 1 ===\nb\n%%%%%%\n"
+    assert _split_batch_response(reply, 2) == ["a", "b"]
+    assert _split_batch_response("=== CHUNK 1 ===\nb\n=== CHUNK 0 ===\na", 2) is None
+    assert _split_batch_response("x\n=== CHUNK 0 ===\na\n=== CHUNK 1 ===\nb", 2) is None
+
+
+class FailingClient(EchoClient):
+    """Echo client that fails on the chunk containing ``Section 2``."""
+
+    async def achat_completion(self, messages, json_mode=False):
+        await asyncio.sleep(0)
+        return self.chat_completion(messages, json_mode=json_mode)
+
+    def chat_completion(self, messages, json_mode=False):
+        if "Section 2" in messages[-1]["content"]:
+            raise ValueError("boom")
+        return super().chat_completion(messages, json_mode=json_mode)
+
+
+def test_translate_chunks_error_names_failing_chunk():
+    """A failed request surfaces as Step2TranslateError naming its chunk."""
+    chunks = _make_chunks()
+    failing = next(c for c in chunks if "Section 2" in c.source_text)
+
+    with pytest.raises(Step2TranslateError, match=failing.chunk_id) as excinfo:
+        translate_chunks(chunks, OUTLINE, GLOSSARY, client=FailingClient())
+    assert isinstance(excinfo.value.__cause__, ValueError)
+
+    with pytest.raises(Step2TranslateError, match=failing.chunk_id):
+        asyncio.run(
+            atranslate_chunks(chunks, OUTLINE, GLOSSARY, client=FailingClient())
+        )
+
+
+def test_leftover_scan_catches_unknown_placeholders_only():
+    """restore() returns text with no known tokens unchecked; QA still flags it."""
+    restored = restore("Call __FOO_001__ here.", {"__URL_001__": "x"}, strict=False)
+
+    assert _validate_restored_chunk(original="Call it here.", restored=restored) == [
+        "QA warning: leftover placeholder __FOO_001__"
+    ]
+
+
+def test_escape_table_cell():
+    """Pipes and newlines are escaped; clean cells are returned as-is."""
+    assert _escape_table_cell("a|b\nc") == "a\\|b<br>c"
+    clean = "no markers here"
+    assert _escape_table_cell(clean) is clean
+
+
+@pytest.mark.parametrize("use_automaton", [True, False], ids=["aho-corasick", "scan"])
+def test_filter_glossary_for_chunk(monkeypatch, use_automaton):
+    """Both term scanners pick the same entries, in priority order."""
+    if use_automaton and step2_translate.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    if not use_automaton:
+        monkeypatch.setattr(step2_translate, "ahocorasick", None)
+    glossary = [
+        {"term_en": term, "term_zh": "译", "note_zh": "", "keep_en_on_first_use": True}
+        for term in [
+            "map",
+            "event loop",
+            "C++",
+            "thread pool executor",
+            "function",
+            "bitmap index",
+            "Python",
+            "async",
+        ]
+    ]
+    chunk = (
+        "A function in C++ uses a bitmap and the event loop; "
+        "each thread pool runs async work."
+    )
+
+    selected = _filter_glossary_for_chunk(glossary, chunk)
+
+    # Exact phrases first, then single words on word boundaries (so "map"
+    # inside "bitmap" is skipped), then partial multi-word overlaps.
+    assert [entry["term_en"] for entry in selected] == [
+        "event loop",
+        "C++",
+        "function",
+        "async",
+        "thread pool executor",
+        "bitmap index",
+    ]